@@ -0,0 +1,301 @@
+from contextlib import nullcontext, redirect_stdout
+from importlib import import_module
+from io import StringIO
+from math import ceil, log
+from multiprocessing import Pipe, Process
+from pathlib import Path
+from statistics import median, stdev
+from time import perf_counter_ns
+from types import ModuleType
+from typing import NamedTuple
+import csv
+import json
+import sys
+import tracemalloc
+
+try:
+    import resource
+except ImportError: # Not available on Windows.
+    resource = None
+
+from input_cache import InputCache
+from profiling import PhaseProfile, PhaseProfiler
+
+PHASES = ("parse","part_one","part_two")
+
+class PhaseStats(NamedTuple):
+    samples:int
+    minimum:float
+    median:float
+    p95:float
+    stddev:float
+
+    @classmethod
+    def from_samples(cls,samples:list[float]) -> "PhaseStats":
+        ordered = sorted(samples)
+        p95 = ordered[max(ceil(0.95 * len(ordered)) - 1,0)]
+        deviation = stdev(ordered) if len(ordered) > 1 else 0.0
+        return cls(len(ordered),ordered[0],median(ordered),p95,deviation)
+
+    def __repr__(self) -> str:
+        return f"min {self.minimum:.3f}; median {self.median:.3f}; p95 {self.p95:.3f}; stddev {self.stddev:.3f} ({self.samples} runs)"
+
+class PhaseMemory(NamedTuple):
+    peak:int
+    net:int
+    top_sites:tuple[str,...]
+
+    def __repr__(self) -> str:
+        return f"peak {self.peak / 1024:.1f} KiB, net {self.net / 1024:+.1f} KiB"
+
+class MemoryTracker:
+    """ Uses tracemalloc to find the peak and net allocations of each phase, and
+    the source lines that allocated the most (and kept it) during the phase. """
+    FILTERS = (
+        tracemalloc.Filter(False,tracemalloc.__file__),
+        tracemalloc.Filter(False,__file__),
+        tracemalloc.Filter(False,"<frozen importlib._bootstrap*>"),
+    )
+
+    def __init__(self,top:int = 3) -> None:
+        self.top = top
+        self.phases:list[PhaseMemory] = list()
+        self._started = False
+        self._snapshot = None
+        self._baseline = 0
+
+    def begin(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        self._snapshot = tracemalloc.take_snapshot().filter_traces(self.FILTERS)
+        tracemalloc.reset_peak()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+
+    def end(self):
+        current,peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot().filter_traces(self.FILTERS)
+        sites = tuple(
+            f"{Path(stat.traceback[0].filename).name}:{stat.traceback[0].lineno} {stat.size_diff / 1024:+.1f} KiB"
+            for stat in after.compare_to(self._snapshot,"lineno")[:self.top]
+            if stat.size_diff > 0
+        )
+        self.phases.append(PhaseMemory(peak - self._baseline,current - self._baseline,sites))
+        self._snapshot = None
+
+    def stop(self):
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+class PhaseRun(NamedTuple):
+    result_one:str
+    result_two:str
+    times:tuple[float,float,float]
+    memory:tuple[PhaseMemory,...]|None = None
+    profiles:tuple[PhaseProfile,...]|None = None
+
+def load_input(daymodule:ModuleType,file_path:Path|None=None,cache:InputCache|None=None):
+    if cache is not None:
+        return cache.load(daymodule,file_path)
+    if file_path is None:
+        return daymodule.parse_input()
+    return daymodule.parse_input(file_path)
+
+def run_phases(daymodule:ModuleType,file_path:Path|None=None,cache:InputCache|None=None,quiet:bool=True,memory:bool=False,profile_dir:Path|None=None) -> PhaseRun:
+    """ Runs the parse step and both parts of a day once, and returns the answers
+    along with how long each phase took in milliseconds. When a cache is given,
+    the parse step goes through it. If `quiet` is set, anything the day prints is
+    discarded. With `memory` set, the allocations of every phase are tracked as
+    well, and with `profile_dir` set every phase is profiled into that directory.
+    Both slow the phases down, so the timings are less meaningful. """
+    times = list()
+    tracker = MemoryTracker() if memory else None
+    profiler = None if profile_dir is None else PhaseProfiler(profile_dir,daymodule.__name__.split(".")[-1])
+
+    def measure(step,*args):
+        phase = PHASES[len(times)]
+        if tracker is not None:
+            tracker.begin()
+        profile = None if profiler is None else profiler.begin()
+        start = perf_counter_ns()
+        value = step(*args)
+        end = perf_counter_ns()
+        if profile is not None:
+            profile.disable()
+            profiler.end(phase)
+        times.append((end - start) / 1_000_000)
+        if tracker is not None:
+            tracker.end()
+        return value
+
+    try:
+        with redirect_stdout(StringIO()) if quiet else nullcontext():
+            parsed_input = measure(load_input,daymodule,file_path,cache)
+            result_one = measure(daymodule.solution_one,parsed_input)
+            result_two = measure(daymodule.solution_two,parsed_input)
+    finally:
+        if tracker is not None:
+            tracker.stop()
+    return PhaseRun(
+        result_one,result_two,tuple(times),
+        None if tracker is None else tuple(tracker.phases),
+        None if profiler is None else tuple(profiler.phases),
+    )
+
+def time_phases(daymodule:ModuleType,file_path:Path|None=None,cache:InputCache|None=None) -> tuple[float,float,float]:
+    return run_phases(daymodule,file_path,cache).times
+
+def benchmark_day(daymodule:ModuleType,warmup:int,repeats:int,cache:InputCache|None=None) -> dict[str,PhaseStats]:
+    """ Runs a day `warmup` times without measuring, then `repeats` times while
+    recording every phase. Returns the statistics per phase. """
+    for _ in range(warmup):
+        time_phases(daymodule,cache=cache)
+    samples = [time_phases(daymodule,cache=cache) for _ in range(repeats)]
+    return {phase:PhaseStats.from_samples([run[i] for run in samples]) for i,phase in enumerate(PHASES)}
+
+def write_json(results:dict[str,dict[str,PhaseStats]],output,warmup:int,repeats:int):
+    document = {
+        "warmup":warmup,
+        "repeats":repeats,
+        "unit":"ms",
+        "days":{day:{phase:stats._asdict() for phase,stats in phases.items()} for day,phases in results.items()}
+    }
+    json.dump(document,output,indent=2)
+    output.write("\n")
+
+def write_csv(results:dict[str,dict[str,PhaseStats]],output):
+    writer = csv.writer(output,lineterminator="\n")
+    writer.writerow(("day","phase") + PhaseStats._fields)
+    for day,phases in results.items():
+        for phase,stats in phases.items():
+            writer.writerow((day,phase) + tuple(stats))
+
+class Regression(NamedTuple):
+    day:str
+    phase:str
+    baseline:PhaseStats
+    current:PhaseStats
+
+    def slowdown(self) -> float:
+        return self.current.median / self.baseline.median if self.baseline.median > 0 else float("inf")
+
+    def __repr__(self) -> str:
+        return f"Day {self.day} {self.phase}: median {self.baseline.median:.3f} -> {self.current.median:.3f} ({self.slowdown():.2f}x)"
+
+def load_baseline(file_path:Path) -> dict[str,dict[str,PhaseStats]]:
+    """ Reads back a file written by write_json. """
+    with open(file_path) as baseline_file:
+        document = json.load(baseline_file)
+    return {day:{phase:PhaseStats(**stats) for phase,stats in phases.items()} for day,phases in document["days"].items()}
+
+def find_regressions(baseline:dict[str,dict[str,PhaseStats]],results:dict[str,dict[str,PhaseStats]],threshold:float,min_delta:float) -> list[Regression]:
+    """ Compares the results of a run against a baseline. A phase counts as slower
+    when its median went up by more than `threshold` (a fraction), the median went
+    up by at least `min_delta` milliseconds, and even its fastest run was slower
+    than the baseline median. Days or phases missing from the baseline are skipped. """
+    regressions = list()
+    for day,phases in results.items():
+        for phase,current in phases.items():
+            old = baseline.get(day,{}).get(phase)
+            if old is None:
+                continue
+            if current.median <= old.median * (1 + threshold):
+                continue
+            if current.median - old.median < min_delta or current.minimum <= old.median:
+                continue
+            regressions.append(Regression(day,phase,old,current))
+    return regressions
+
+class ScalePoint(NamedTuple):
+    scale:int
+    input_bytes:int
+    times:tuple[float,float,float]|None
+    peak_bytes:int
+
+    def total_time(self) -> float:
+        return sum(self.times)
+
+def peak_rss() -> int:
+    """ The peak resident set size of this process so far, in bytes. """
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == "darwin" else usage * 1024
+
+def measure_in_child(module_name:str,file_path:Path,connection):
+    """ Runs in a separate process: times a day on the given input, and finds
+    how much its peak memory use grew. Where the resident set size is not
+    available, the day is run a second time while tracing allocations instead,
+    which is a lot slower. """
+    daymodule = import_module(module_name)
+    if resource is not None:
+        before = peak_rss()
+        times = time_phases(daymodule,file_path)
+        peak = peak_rss() - before
+    else:
+        times = time_phases(daymodule,file_path)
+        tracemalloc.start()
+        run_phases(daymodule,file_path)
+        _,peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    connection.send((times,peak))
+
+def measure_scaled(module_name:str,file_path:Path,timeout:float) -> tuple[tuple[float,float,float],int]|None:
+    """ Measures a day on the given input in a child process, so a run that takes
+    too long can be stopped. Returns None if it timed out or failed. """
+    receiver,sender = Pipe(duplex=False)
+    process = Process(target=measure_in_child,args=(module_name,file_path,sender),daemon=True)
+    process.start()
+    sender.close()
+    result = None
+    try:
+        if receiver.poll(timeout):
+            result = receiver.recv()
+    except EOFError:
+        pass # The child died without sending anything.
+    finally:
+        process.terminate()
+        process.join()
+        receiver.close()
+    return result
+
+def growth_exponent(sizes:list[float],values:list[float]) -> float|None:
+    """ Fits values = c * sizes^k on a log-log scale and returns k, or None
+    if there are not enough points to fit. """
+    points = [(log(size),log(value)) for size,value in zip(sizes,values) if size > 0 and value > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x,_ in points) / len(points)
+    mean_y = sum(y for _,y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x,_ in points)
+    if spread == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x,y in points) / spread
+
+def log_bar(value:float,low:float,high:float,width:int = 30) -> str:
+    """ A bar whose length is the position of value between low and high, on a log scale. """
+    if value <= 0 or low <= 0 or high <= low:
+        return "#"
+    return "#" * max(1,round(width * (log(value) - log(low) + log(2)) / (log(high) - log(low) + log(2))))
+
+class BatchResult(NamedTuple):
+    file_path:Path
+    result_one:str
+    result_two:str
+    times:tuple[float,float,float]
+    error:str|None = None
+
+    def __repr__(self) -> str:
+        if self.error is not None:
+            return f"{self.file_path.name}: failed; {self.error}"
+        return f"{self.file_path.name}: {self.result_one}; {self.result_two}; {sum(self.times):.3f} ms"
+
+def run_batch_input(module_name:str,file_path:Path,cache:InputCache|None=None) -> BatchResult:
+    """ Runs a day on one input of a batch. The day module is only imported the
+    first time in each process. A failing input is reported instead of raised,
+    so one bad input does not stop the rest of the batch. """
+    daymodule = import_module(module_name)
+    try:
+        run = run_phases(daymodule,file_path,cache)
+    except Exception as error:
+        return BatchResult(file_path,"","",(0.0,0.0,0.0),f"{type(error).__name__}: {error}")
+    return BatchResult(file_path,run.result_one,run.result_two,run.times)
@@ -1,9 +1,68 @@
 from pathlib import Path
 from time import perf_counter_ns
-import re
+import sys
 
 INPUT_NAME = "day01.txt"
 INPUT_PATH = Path(__file__).parent.parent.parent / "input" / INPUT_NAME
+WORD_VALUES = {"1":1,"2":2,"3":3,"4":4,"5":5,"6":6,"7":7,"8":8,"9":9,"one":1,"two":2,"three":3,"four":4,"five":5,"six":6,"seven":7,"eight":8,"nine":9}
+
+class DigitAutomaton:
+    """ Aho-Corasick automaton over the digits and spelled-out digits. Every
+    state knows where each character leads, and which digit (if any) was just
+    completed, so a text can be scanned left to right one character at a time
+    while still catching overlapping words like "twone". """
+
+    def __init__(self,words:dict[str,int]) -> None:
+        # Build the trie.
+        self.transitions:list[dict[str,int]] = [dict()]
+        self.outputs:list[int] = [0]
+        for word,value in words.items():
+            state = 0
+            for char in word:
+                if char not in self.transitions[state]:
+                    self.transitions.append(dict())
+                    self.outputs.append(0)
+                    self.transitions[state][char] = len(self.transitions) - 1
+                state = self.transitions[state][char]
+            self.outputs[state] = value
+        # Breadth-first, fill in the failure links as direct transitions.
+        alphabet = set("".join(words))
+        failure = [0] * len(self.transitions)
+        queue = list(self.transitions[0].values())
+        for char in alphabet:
+            self.transitions[0].setdefault(char,0)
+        for state in queue:
+            for char in alphabet:
+                if char in self.transitions[state]:
+                    child = self.transitions[state][char]
+                    failure[child] = self.transitions[failure[state]][char]
+                    if self.outputs[child] == 0:
+                        self.outputs[child] = self.outputs[failure[child]]
+                    queue.append(child)
+                else:
+                    self.transitions[state][char] = self.transitions[failure[state]][char]
+
+    def calibration_sum(self,text:str) -> int:
+        """ Sums the calibration values of every line in the text, in a single
+        pass over the whole text. """
+        transitions,outputs = self.transitions,self.outputs
+        total,state,first,last = 0,0,0,0
+        for char in text:
+            if char == "\n":
+                total += (first * 10) + last
+                state,first,last = 0,0,0
+                continue
+            state = transitions[state].get(char,0)
+            value = outputs[state]
+            if value:
+                if not first:
+                    first = value
+                last = value
+        return total + (first * 10) + last
+
+DIGIT_AUTOMATON = DigitAutomaton(WORD_VALUES)
+PLAIN_AUTOMATON = DigitAutomaton({word:value for word,value in WORD_VALUES.items() if word.isdigit()})
+CHUNK_SIZE = 1 << 22
 
 def parse_line(line:str):
     if len(line) == 0:
@@ -25,14 +84,46 @@ def solution_one(parsed_input:tuple) -> str:
     return str(sum(numbers))
 
 def solution_two(parsed_input:tuple) -> str:
-    numbers = []
-    word_values = {"1":1,"2":2,"3":3,"4":4,"5":5,"6":6,"7":7,"8":8,"9":9,"one":1,"two":2,"three":3,"four":4,"five":5,"six":6,"seven":7,"eight":8,"nine":9}
-    number_pattern = re.compile(r'([1-9]|one|two|three|four|five|six|seven|eight|nine)')
-    reverse_pattern = re.compile(r'([1-9])|eno|owt|eerht|ruof|evif|xis|neves|thgie|enin')
-    for line in parsed_input:
-        first,last = number_pattern.search(line).group(),reverse_pattern.search(line[::-1]).group()
-        numbers.append((word_values[first]*10)+word_values[last[::-1]])
-    return str(sum(numbers))
+    return str(DIGIT_AUTOMATON.calibration_sum("\n".join(parsed_input)))
+
+def chunk_bounds(file_path:Path,chunk_size:int = CHUNK_SIZE):
+    """ Splits the file into (start, end) byte ranges of roughly chunk_size,
+    each ending just after a newline (or at the end of the file). """
+    import mmap
+    with open(file_path,"rb") as input_file:
+        with mmap.mmap(input_file.fileno(),0,access=mmap.ACCESS_READ) as buffer:
+            start = 0
+            while start < len(buffer):
+                end = buffer.find(b"\n",min(start + chunk_size,len(buffer)) - 1)
+                end = len(buffer) if end < 0 else end + 1
+                yield start,end
+                start = end
+
+def chunk_sums(file_path:Path,start:int,end:int) -> tuple[int,int]:
+    """ Sums the calibration values (for both stars) of the lines in one chunk. """
+    import mmap
+    with open(file_path,"rb") as input_file:
+        with mmap.mmap(input_file.fileno(),0,access=mmap.ACCESS_READ) as buffer:
+            text = buffer[start:end].decode()
+    return PLAIN_AUTOMATON.calibration_sum(text),DIGIT_AUTOMATON.calibration_sum(text)
+
+def stream_solutions(file_path:Path = INPUT_PATH,jobs:int|None = None,chunk_size:int = CHUNK_SIZE) -> tuple[str,str]:
+    """ Solves both stars without loading the whole input: the file is memory-mapped,
+    cut into chunks at line boundaries, and every chunk is summed in a worker
+    process. Memory use depends on the chunk size, not on the file size. """
+    # Only streaming needs these; importing them for every run slows down start-up.
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import repeat
+    if not file_path.exists() or file_path.stat().st_size == 0:
+        return "0","0"
+    total_one,total_two = 0,0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        bounds = list(chunk_bounds(file_path,chunk_size))
+        starts,ends = [start for start,_ in bounds],[end for _,end in bounds]
+        for sum_one,sum_two in pool.map(chunk_sums,repeat(file_path),starts,ends):
+            total_one += sum_one
+            total_two += sum_two
+    return str(total_one),str(total_two)
 
 def solve_day() -> tuple[float,float,float]:
     times = [0,0,0,0]
@@ -52,4 +143,9 @@ def solve_day() -> tuple[float,float,float]:
     return time_one, time_two, time_total
 
 if __name__ == "__main__":
-    solve_day()
+    if "--stream" in sys.argv:
+        start = perf_counter_ns()
+        result_one,result_two = stream_solutions()
+        print(f"=== Day 01 (streaming) ===\n  · Part 1: {result_one}\n  · Part 2: {result_two}\n  · Time: {(perf_counter_ns() - start) / 1_000_000}")
+    else:
+        solve_day()
@@ -1,6 +1,8 @@
+from array import array
+from bisect import bisect_left, bisect_right
 from pathlib import Path
 from time import perf_counter_ns
-from typing import NamedTuple
+from typing import NamedTuple, Sequence
 
 INPUT_NAME = "day02.txt"
 INPUT_PATH = Path(__file__).parent.parent.parent / "input" / INPUT_NAME
@@ -30,55 +32,115 @@ class CubeHand(NamedTuple):
     def hand_power(self) -> int:
         return self.red * self.blue * self.green
 
-class SingleGame(NamedTuple):
-    id_number: int
-    hands:tuple[CubeHand,...]
-    
+class BagTotal(NamedTuple):
+    count:int
+    id_sum:int
+
+class Fenwick2D:
+    """ Fenwick tree over a grid, keeping both a count and a sum per cell, so
+    that the totals over any bottom-left rectangle can be read in log time. """
+    def __init__(self,width:int,height:int) -> None:
+        self.width = width
+        self.height = height
+        self.counts = [[0] * (height + 1) for _ in range(width + 1)]
+        self.sums = [[0] * (height + 1) for _ in range(width + 1)]
+
+    def add(self,x:int,y:int,value:int):
+        """ Adds one item with the given value at cell (x, y), 0-based. """
+        i = x + 1
+        while i <= self.width:
+            counts,sums = self.counts[i],self.sums[i]
+            j = y + 1
+            while j <= self.height:
+                counts[j] += 1
+                sums[j] += value
+                j += j & -j
+            i += i & -i
+
+    def prefix(self,x:int,y:int) -> BagTotal:
+        """ Totals over all cells with a column below x and a row below y. """
+        count,total = 0,0
+        i = x
+        while i > 0:
+            counts,sums = self.counts[i],self.sums[i]
+            j = y
+            while j > 0:
+                count += counts[j]
+                total += sums[j]
+                j -= j & -j
+            i -= i & -i
+        return BagTotal(count,total)
+
+class GameLog(NamedTuple):
+    """ All games, stored per column: the id of every game, and the most cubes
+    of each colour shown in any of its hands. """
+    ids:array
+    red:array
+    green:array
+    blue:array
+
     def __repr__(self) -> str:
-        return f"Game id {self.id_number}; hands: {' '.join(repr(hand) for hand in self.hands)}"
+        return f"Log of {len(self.ids)} games"
+
+    def minimum_bag(self,index:int) -> CubeHand:
+        return CubeHand(self.red[index],self.green[index],self.blue[index])
 
-def parse_line(line:str):
+    def bag_totals(self,bags:Sequence[CubeHand]) -> list[BagTotal]:
+        """ For every bag, counts the games that are possible with it and sums
+        their ids. A game is possible when the bag dominates its minimum bag
+        in all three colours. The bags are answered together: sweeping both
+        games and bags by red, games enter a 2D tree over green and blue as soon
+        as the current bag has enough red for them, and each bag then only has
+        to query that tree. """
+        greens = sorted(set(self.green))
+        blues = sorted(set(self.blue))
+        tree = Fenwick2D(len(greens),len(blues))
+        games = sorted(range(len(self.ids)),key=self.red.__getitem__)
+        answers:list[BagTotal] = [BagTotal(0,0)] * len(bags)
+        added = 0
+        for query in sorted(range(len(bags)),key=lambda i:bags[i].red):
+            bag = bags[query]
+            while added < len(games) and self.red[games[added]] <= bag.red:
+                game = games[added]
+                tree.add(bisect_left(greens,self.green[game]),bisect_left(blues,self.blue[game]),self.ids[game])
+                added += 1
+            answers[query] = tree.prefix(bisect_right(greens,bag.green),bisect_right(blues,bag.blue))
+        return answers
+
+def parse_line(line:str) -> tuple[int,int,int,int]|None:
+    """ Returns the game id and the most cubes of each colour seen in one hand. """
     line = line.strip()
     if line == "":
         return None
     line = line.split(":")
     game_id = int(line[0].split(' ')[1])
-    hands = []
+    rgb = [0,0,0]
     for hand in line[1].split(';'):
-        rgb = [0,0,0]
         for colour in hand.split(','):
             _, num, col = colour.split(" ")
-            if col == "red":
-                rgb[0] = int(num)
-            elif col == "green":
-                rgb[1] = int(num)
-            else:
-                rgb[2] = int(num)
-        hands.append(CubeHand(*rgb))
-            
-    return SingleGame(game_id,tuple(hands))
-
-def parse_input(file_path = INPUT_PATH):
-    parsed_input = list()
+            index = 0 if col == "red" else 1 if col == "green" else 2
+            rgb[index] = max(rgb[index],int(num))
+    return game_id,rgb[0],rgb[1],rgb[2]
+
+def parse_input(file_path = INPUT_PATH) -> GameLog:
+    parsed_input = GameLog(array("q"),array("q"),array("q"),array("q"))
     if file_path.exists():
         with open(file_path) as input_file:
-            parsed_input = tuple(parse_line(line) for line in input_file)
-    return tuple(i for i in parsed_input if i is not None)
+            for line in input_file:
+                game = parse_line(line)
+                if game is None:
+                    continue
+                for column,value in zip(parsed_input,game):
+                    column.append(value)
+    return parsed_input
 
-def solution_one(parsed_input:tuple[SingleGame,...]) -> str:
-    id_sum = 0
-    play_set = CubeHand(12,13,14)
-    for _input in parsed_input:
-        id_sum += _input.id_number if all(hand in play_set for hand in _input.hands) else 0
-    return str(id_sum)
+def solution_one(parsed_input:GameLog) -> str:
+    return str(parsed_input.bag_totals([CubeHand(12,13,14)])[0].id_sum)
 
-def solution_two(parsed_input:tuple[SingleGame,...]) -> str:
+def solution_two(parsed_input:GameLog) -> str:
     power_sum = 0
-    for _input in parsed_input:
-        running_total = _input.hands[0]
-        for subhand in _input.hands[1:]:
-            running_total = running_total.smallest_overlap(subhand)
-        power_sum += running_total.hand_power()
+    for red,green,blue in zip(parsed_input.red,parsed_input.green,parsed_input.blue):
+        power_sum += red * green * blue
     return str(power_sum)
 
 def solve_day() -> tuple[float,float,float]:
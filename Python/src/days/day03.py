@@ -1,7 +1,9 @@
+from array import array
 from pathlib import Path
 from time import perf_counter_ns
 from itertools import product
-from typing import NamedTuple
+from typing import Iterable, Iterator, NamedTuple
+import sys
 
 INPUT_NAME = "day03.txt"
 INPUT_PATH = Path(__file__).parent.parent.parent / "input" / INPUT_NAME
@@ -23,21 +25,22 @@ class PartPostion(NamedTuple):
 class SchematicRow(NamedTuple):
     numbers:tuple[NumberPosition,...]
     part_positions:tuple[PartPostion,...]
+    number_ids:array # For every position, the index of the number there or -1.
     
     def number_at(self,position:int):
-        for number in self.numbers:
-            if position in number:
-                return number
-        return None
+        if position < 0 or position >= len(self.number_ids):
+            return None
+        number_id = self.number_ids[position]
+        return None if number_id < 0 else self.numbers[number_id]
 
     def char_at(self,position:int):
+        number = self.number_at(position)
+        if number is not None:
+            number_str = str(number.value)
+            return number_str[position - number.start]
         for part in self.part_positions:
             if position == part.position:
                 return part.shape
-        for number in self.numbers:
-            if position in number:
-                number_str = str(number.value)
-                return number_str[position - number.start]
         return '.'
     
     def __repr__(self) -> str:
@@ -82,7 +85,10 @@ def parse_line(line:str):
     except:
         if number is not None:
             numbers.append(NumberPosition(number,begin,len(line)-1))
-    return SchematicRow(tuple(numbers),tuple(parts))
+    number_ids = array("i",[-1]) * len(line)
+    for number_id,number in enumerate(numbers):
+        number_ids[number.start:number.end+1] = array("i",[number_id]) * (number.end - number.start + 1)
+    return SchematicRow(tuple(numbers),tuple(parts),number_ids)
 
 def parse_input(file_path = INPUT_PATH):
     parsed_input = None
@@ -95,8 +101,8 @@ def parse_input(file_path = INPUT_PATH):
     return Schematic(tuple(x for x in parsed_input if x is not None),width,height)
 
 def iterate_around(x:int,y:int,width:int,height:int):
-    top,bottom = max(y-1,0),min(y+1,height)
-    left,right = max(x-1,0),min(x+1,width)
+    top,bottom = max(y-1,0),min(y+1,height-1)
+    left,right = max(x-1,0),min(x+1,width-1)
     return product(range(left,right+1),range(top,bottom+1))
 
 def solution_one(parsed_input:Schematic) -> str:
@@ -111,8 +117,8 @@ def solution_one(parsed_input:Schematic) -> str:
                 num = rows[y_a].number_at(x_a)
                 if num is None:
                     continue
-                numbers.add(num)
-            total += sum(num.value for num in numbers)
+                numbers.add((y_a,num)) # Equal numbers on different rows are different numbers.
+            total += sum(num.value for _,num in numbers)
     
     return str(total)
 
@@ -130,12 +136,60 @@ def solution_two(parsed_input:Schematic) -> str:
                 num = rows[y_a].number_at(x_a)
                 if num is None:
                     continue
-                numbers.add(num)
+                numbers.add((y_a,num))
             if len(numbers) != 2:
                 continue #Gears have exactly two adjacent numbers.
-            total += numbers.pop().value * numbers.pop().value
+            total += numbers.pop()[1].value * numbers.pop()[1].value
     return str(total)
 
+class StreamHit(NamedTuple):
+    kind:str # "part" for a number next to a part, "gear" for a gear ratio.
+    row:int
+    value:int
+
+def window_hits(y:int,above:SchematicRow|None,row:SchematicRow,below:SchematicRow|None) -> Iterator[StreamHit]:
+    """ Finds the part numbers and gear ratios around the parts of one row,
+    given only the rows directly above and below it. """
+    window = tuple(r for r in (above,row,below) if r is not None)
+    for part in row.part_positions:
+        numbers = dict()
+        for neighbour_row,r in enumerate(window):
+            for x in range(part.position-1,part.position+2):
+                number_id = r.number_ids[x] if 0 <= x < len(r.number_ids) else -1
+                if number_id >= 0:
+                    numbers[(neighbour_row,number_id)] = r.numbers[number_id].value
+        for value in numbers.values():
+            yield StreamHit("part",y,value)
+        if part.shape == "*" and len(numbers) == 2:
+            first,second = numbers.values()
+            yield StreamHit("gear",y,first * second)
+
+def stream_hits(lines:Iterable[str]) -> Iterator[StreamHit]:
+    """ Slides a three-row window down the lines, parsing each line as it comes
+    in and emitting the hits of the middle row as soon as the row below it is
+    known. Only three rows are ever kept, so the input can be arbitrarily tall. """
+    above,row = None,None
+    y = -1
+    for line in lines:
+        below = parse_line(line)
+        if below is None:
+            continue
+        if row is not None:
+            yield from window_hits(y,above,row,below)
+        above,row = row,below
+        y += 1
+    if row is not None:
+        yield from window_hits(y,above,row,None)
+
+def stream_solutions(lines:Iterable[str]) -> tuple[str,str]:
+    part_total,gear_total = 0,0
+    for hit in stream_hits(lines):
+        if hit.kind == "part":
+            part_total += hit.value
+        else:
+            gear_total += hit.value
+    return str(part_total),str(gear_total)
+
 def solve_day() -> tuple[float,float,float]:
     times = [0,0,0,0]
     times[0] = perf_counter_ns()
@@ -154,4 +208,12 @@ def solve_day() -> tuple[float,float,float]:
     return time_one, time_two, time_total
 
 if __name__ == "__main__":
-    solve_day()
\ No newline at end of file
+    if "--stream" in sys.argv:
+        # Read from the given file, or from stdin for "-".
+        source = sys.argv[sys.argv.index("--stream")+1] if len(sys.argv) > sys.argv.index("--stream")+1 else str(INPUT_PATH)
+        start = perf_counter_ns()
+        with (open(source) if source != "-" else sys.stdin) as input_file:
+            result_one,result_two = stream_solutions(input_file)
+        print(f"=== Day 03 (streaming) ===\n  · Part 1: {result_one}\n  · Part 2: {result_two}\n  · Time: {(perf_counter_ns() - start) / 1_000_000}")
+    else:
+        solve_day()
\ No newline at end of file
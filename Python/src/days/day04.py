@@ -1,27 +1,38 @@
+from collections import deque
 from pathlib import Path
 from time import perf_counter_ns
-from typing import NamedTuple
+from typing import Iterable, NamedTuple
+import sys
 
 INPUT_NAME = "day04.txt"
 INPUT_PATH = Path(__file__).parent.parent.parent / "input" / INPUT_NAME
 
+def to_bitset(numbers:str) -> int:
+    """ Turns a list of numbers into an int with the bit of every number set. """
+    bits = 0
+    for number in numbers.split():
+        bits |= 1 << int(number)
+    return bits
+
+def from_bitset(bits:int) -> tuple[int,...]:
+    return tuple(x for x in range(bits.bit_length()) if bits >> x & 1)
+
 class Scratchcard(NamedTuple):
     card_id:int
-    winning:frozenset[int]
-    found:frozenset[int]
+    winning:int # Bitset of the winning numbers.
+    found:int # Bitset of the numbers on the card.
+    matches:int
     
     def total_score(self) -> int:
-        overlap = self.winning & self.found
-        if len(overlap) == 0:
+        if self.matches == 0:
             return 0
-        return 1 << (len(overlap)-1)
+        return 1 << (self.matches-1)
     
     def points(self) -> int:
-        overlap = self.winning & self.found
-        return len(overlap)
+        return self.matches
     
     def __repr__(self) -> str:
-        return f"Card {self.card_id}: {''.join(f' {x:> 2}' for x in self.winning)} | {''.join(f' {x:> 2}' for x in self.found)}; {self.total_score()}"
+        return f"Card {self.card_id}: {''.join(f' {x:> 2}' for x in from_bitset(self.winning))} | {''.join(f' {x:> 2}' for x in from_bitset(self.found))}; {self.total_score()}"
 
 def parse_line(line:str):
     """ Parse one line of the input into an 'object' for the solution.
@@ -33,11 +44,10 @@ def parse_line(line:str):
     colon = line.index(':')
     bar = line.index('|')
     id = int(line[space:colon])
-    #print(*(number for number in line[colon+1:bar].split(' ')))
-    winners = frozenset(int(number.strip()) for number in line[colon+1:bar].split(' ') if number.strip() != "")
-    found = frozenset(int(number.strip()) for number in line[bar+1:].split(' ') if number.strip() != "")
+    winners = to_bitset(line[colon+1:bar])
+    found = to_bitset(line[bar+1:])
     
-    return Scratchcard(id,winners,found)
+    return Scratchcard(id,winners,found,(winners & found).bit_count())
 
 def parse_input(file_path = INPUT_PATH):
     """ Loads the given file, and parses it line-by-line. Should return
@@ -58,20 +68,42 @@ def solution_two(parsed_input:tuple[Scratchcard,...]) -> str:
     """ Takes the (parsed) input of the puzzle and uses it to solve for
     the second star of the day. """
     #We got lanternfish'd.
-    card_counts = [1] * len(parsed_input)
-    
-    for i,card in enumerate(parsed_input):
-        score = card.points()
-        #print(f"{i}: {card_counts}, {score}")
-        if score == 0:
+    return str(cascade_total(card.matches for card in parsed_input))
+
+def cascade_total(matches:Iterable[int]) -> int:
+    """ Counts the cards (originals and copies) given the number of matches on
+    each card, in order. Instead of adding the copies of a card to each of the
+    following cards, the change in extra copies is noted where it starts and
+    where it stops (a difference array), and a running total is kept. Only the
+    next few cards' changes are stored, so the cards can come from a stream. """
+    pending = deque() # pending[k] is the change in extra copies, k+1 cards ahead.
+    extra = 0
+    total = 0
+    for match_count in matches:
+        if pending:
+            extra += pending.popleft()
+        copies = 1 + extra
+        total += copies
+        if match_count == 0:
             continue
-        copies = card_counts[i]
-        stop_at = min(len(parsed_input),i+score+1)
-        for j in range(i+1,stop_at):
-            card_counts[j] += copies
-    
-    #print(card_counts)
-    return str(sum(card_counts))
+        while len(pending) <= match_count:
+            pending.append(0)
+        pending[0] += copies
+        pending[match_count] -= copies
+    return total
+
+def stream_solutions(lines:Iterable[str]) -> tuple[str,str]:
+    """ Solves both stars while reading the cards one line at a time. """
+    score = 0
+    def matches():
+        nonlocal score
+        for line in lines:
+            card = parse_line(line)
+            if card is not None:
+                score += card.total_score()
+                yield card.matches
+    cards = cascade_total(matches())
+    return str(score),str(cards)
 
 def solve_day() -> tuple[float,float,float]:
     times = [0,0,0,0]
@@ -91,4 +123,12 @@ def solve_day() -> tuple[float,float,float]:
     return time_one, time_two, time_total
 
 if __name__ == "__main__":
-    solve_day()
+    if "--stream" in sys.argv:
+        # Read from the given file, or from stdin for "-".
+        source = sys.argv[sys.argv.index("--stream")+1] if len(sys.argv) > sys.argv.index("--stream")+1 else str(INPUT_PATH)
+        start = perf_counter_ns()
+        with (open(source) if source != "-" else sys.stdin) as input_file:
+            result_one,result_two = stream_solutions(input_file)
+        print(f"=== Day 04 (streaming) ===\n  · Part 1: {result_one}\n  · Part 2: {result_two}\n  · Time: {(perf_counter_ns() - start) / 1_000_000}")
+    else:
+        solve_day()
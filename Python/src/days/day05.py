@@ -1,15 +1,24 @@
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 from time import perf_counter_ns
-from typing import NamedTuple
+from typing import Iterable, Iterator, NamedTuple
+
+try:
+    import numpy
+except ImportError: # Bulk mapping falls back to the standard library.
+    numpy = None
 
 INPUT_NAME = "day05.txt"
 INPUT_PATH = Path(__file__).parent.parent.parent / "input" / INPUT_NAME
 NWLN = '\n'
 
-PROCESSING_STEPS = [step for step in "seed soil fertilizer water light temperature humidity location".split(" ")]
+BULK_CHUNK = 1 << 16
+COMPOSED_CACHE_SIZE = 8
 
-def flatten_list(lists:list[list]) -> list:
-    return [item for sublist in lists for item in sublist]
+PROCESSING_STEPS = [step for step in "seed soil fertilizer water light temperature humidity location".split(" ")]
 
 class MappedRange(NamedTuple):
     r_start:int
@@ -19,6 +28,17 @@ class MappedRange(NamedTuple):
     def from_range(cls,rng:range) -> "MappedRange":
         return MappedRange(rng.start,rng.stop-1)
 
+def coalesce(ranges:list[MappedRange]) -> list[MappedRange]:
+    """ Sorts the ranges and merges the ones that overlap or touch. """
+    retval = list()
+    for rng in sorted(ranges):
+        if retval and rng.r_start <= retval[-1].r_end + 1:
+            if rng.r_end > retval[-1].r_end:
+                retval[-1] = MappedRange(retval[-1].r_start,rng.r_end)
+        else:
+            retval.append(rng)
+    return retval
+
 class Mapping(NamedTuple):
     dest_start:int
     source_start:int
@@ -67,38 +87,154 @@ class Mapping(NamedTuple):
     
 class MapSet(NamedTuple):
     dest_type:str
-    mappings:tuple[Mapping,...]
+    mappings:tuple[Mapping,...] # Sorted by source_start.
+    starts:tuple[int,...] # The source_start of every mapping, for bisecting.
+    
+    @classmethod
+    def from_mappings(cls,dest_type:str,mappings:list[Mapping]) -> "MapSet":
+        ordered = tuple(sorted(mappings,key=lambda x:x.source_start))
+        return MapSet(dest_type,ordered,tuple(mapping.source_start for mapping in ordered))
+    
+    def find_mapping(self,value:int) -> Mapping|None:
+        """ The mapping whose source range contains the value, if any. The source
+        ranges of a map never overlap, so only the last mapping starting at or
+        before the value can contain it. """
+        i = bisect_right(self.starts,value) - 1
+        if i >= 0 and self.mappings[i].source_contains(value):
+            return self.mappings[i]
+        return None
     
     def map_number(self,value:int) -> int:
-        mapping = next(filter(lambda x:x.source_contains(value),self.mappings),None)
+        mapping = self.find_mapping(value)
         if mapping is not None:
             return mapping.map_number(value)
         return value
     
+    def to_piecewise(self) -> "Piecewise":
+        bounds = list()
+        offsets = [0]
+        for mapping in self.mappings:
+            if mapping.range_length <= 0:
+                continue
+            if not bounds or bounds[-1] != mapping.source_start:
+                bounds.append(mapping.source_start)
+                offsets.append(0)
+            offsets[-1] = mapping.dest_start - mapping.source_start
+            bounds.append(mapping.source_start + mapping.range_length)
+            offsets.append(0)
+        return Piecewise.coalesced(bounds,offsets)
+    
     def map_verbose(self,value:int) -> int:
-        mapping = next(filter(lambda x:x.source_contains(value),self.mappings),None)
+        mapping = self.find_mapping(value)
         if mapping is not None:
             print(f"mapping {value} with {mapping!r}")
             return mapping.map_number(value)
         return value
     
     def map_range(self,rng:MappedRange) -> list[MappedRange]:
-        to_map = [rng]
-        mappedval = list()
-        for mapping in self.mappings:
-            for r in to_map:
-                to_map.remove(r)
-                mapped, unmapped = mapping.map_range(r)
-                to_map.extend(unmapped)
-                if mapped is not None:
-                    mappedval.append(mapped)
-        retval = list(to_map)
-        retval.extend(mappedval)
-        return retval
+        return self.map_ranges([rng])
+    
+    def map_ranges(self,ranges:list[MappedRange]) -> list[MappedRange]:
+        """ Maps a list of ranges in one sweep: the ranges are sorted and merged
+        first, so they and the mappings can both be walked in order of their
+        start. The result is merged again, so it is sorted and no two ranges
+        overlap or touch. """
+        retval = list()
+        j = 0
+        for rng in coalesce(ranges):
+            start = rng.r_start
+            while start <= rng.r_end:
+                # Skip the mappings that end before this point.
+                while j < len(self.mappings) and self.mappings[j].source_start + self.mappings[j].range_length <= start:
+                    j += 1
+                if j == len(self.mappings) or self.mappings[j].source_start > rng.r_end:
+                    retval.append(MappedRange(start,rng.r_end))
+                    break
+                mapping = self.mappings[j]
+                if mapping.source_start > start:
+                    retval.append(MappedRange(start,mapping.source_start-1))
+                    start = mapping.source_start
+                end = min(rng.r_end,mapping.source_start + mapping.range_length - 1)
+                retval.append(MappedRange(mapping.map_number(start),mapping.map_number(end)))
+                start = end + 1
+        return coalesce(retval)
     
     def __repr__(self) -> str:
         return f"\nMap to {self.dest_type}:\n{NWLN.join(repr(mapping) for mapping in self.mappings)}"
 
+class Piecewise(NamedTuple):
+    """ A function over all integers that adds a constant offset on each piece.
+    Piece i covers bounds[i-1] up to (but not including) bounds[i], where the
+    first piece is unbounded on the left and the last one on the right, so
+    there is always one more offset than there are bounds. """
+    bounds:tuple[int,...]
+    offsets:tuple[int,...]
+    
+    @classmethod
+    def coalesced(cls,bounds:list[int],offsets:list[int]) -> "Piecewise":
+        """ Builds the function, merging neighbouring pieces with the same offset. """
+        merged_bounds = list()
+        merged_offsets = [offsets[0]]
+        for bound,offset in zip(bounds,offsets[1:]):
+            if offset == merged_offsets[-1]:
+                continue
+            merged_bounds.append(bound)
+            merged_offsets.append(offset)
+        return Piecewise(tuple(merged_bounds),tuple(merged_offsets))
+    
+    def map_number(self,value:int) -> int:
+        return value + self.offsets[bisect_right(self.bounds,value)]
+    
+    def map_range(self,rng:MappedRange) -> list[MappedRange]:
+        """ Maps the range one piece at a time, in order of the source values. """
+        i = bisect_right(self.bounds,rng.r_start)
+        start = rng.r_start
+        retval = list()
+        while True:
+            end = rng.r_end if i == len(self.bounds) or self.bounds[i] > rng.r_end else self.bounds[i] - 1
+            retval.append(MappedRange(start + self.offsets[i],end + self.offsets[i]))
+            if end == rng.r_end:
+                return retval
+            start = end + 1
+            i += 1
+    
+    def minimum(self,rng:MappedRange) -> int:
+        """ The lowest value the range maps to. """
+        return min(r.r_start for r in self.map_range(rng))
+    
+    def then(self,after:"Piecewise") -> "Piecewise":
+        """ Composes the two functions: the result maps a value through this
+        function, and then through `after`. Every piece of this function is
+        split where its image crosses a bound of `after`. """
+        bounds = list()
+        offsets = list()
+        for i,offset in enumerate(self.offsets):
+            high = self.bounds[i] if i < len(self.bounds) else None
+            if i == 0:
+                j = 0
+            else:
+                bounds.append(self.bounds[i-1])
+                j = bisect_right(after.bounds,self.bounds[i-1] + offset)
+            offsets.append(offset + after.offsets[j])
+            while j < len(after.bounds) and (high is None or after.bounds[j] < high + offset):
+                bounds.append(after.bounds[j] - offset)
+                j += 1
+                offsets.append(offset + after.offsets[j])
+        return Piecewise.coalesced(bounds,offsets)
+
+IDENTITY = Piecewise((),(0,))
+
+@lru_cache(maxsize=COMPOSED_CACHE_SIZE)
+def compose_maps(mappings:tuple[MapSet,...]) -> Piecewise:
+    """ Composes a chain of maps into a single function. Only the last few chains
+    are cached, so a long batch of almanacs does not keep them all alive. A
+    lookup still hashes the whole chain, so callers with many queries should
+    hold on to the function rather than ask for it again. """
+    composed = IDENTITY
+    for mapping in mappings:
+        composed = composed.then(mapping.to_piecewise())
+    return composed
+
 class Almanac(NamedTuple):
     seeds:tuple[int,...]
     mappings:tuple[MapSet,...]
@@ -115,12 +251,54 @@ class Almanac(NamedTuple):
         print(f"Location: {value}")
         return value
     
+    def composed(self) -> Piecewise:
+        """ The whole chain of maps as one function from seed to location, for
+        when many values or ranges have to be mapped: each query is then a single
+        bisection instead of one per map. Keep the returned function around
+        for repeated queries; asking again means hashing every map. """
+        return compose_maps(self.mappings)
+    
+    def map_chunks(self,seeds:Iterable[int],chunk_size:int = BULK_CHUNK) -> Iterator[array]:
+        """ Maps the seeds to their locations `chunk_size` seeds at a time, and
+        yields the locations of each chunk as an array("q") of 64-bit integers,
+        so only one chunk is in memory at a time. Every seed goes through the
+        composed function. With numpy installed, a chunk is mapped with a single
+        sorted search over its bounds and copied back into an array("q"); without
+        it, the seeds are bisected one by one in Python, which is a lot slower.
+        Either way, the results are the same kind of array. """
+        composed = self.composed()
+        if numpy is not None:
+            bounds = numpy.array(composed.bounds,dtype=numpy.int64)
+            offsets = numpy.array(composed.offsets,dtype=numpy.int64)
+        seeds = iter(seeds)
+        while True:
+            chunk = array("q",islice(seeds,chunk_size))
+            if len(chunk) == 0:
+                return
+            if numpy is not None:
+                values = numpy.frombuffer(chunk,dtype=numpy.int64)
+                locations = array("q")
+                locations.frombytes((values + offsets[numpy.searchsorted(bounds,values,side="right")]).tobytes())
+                yield locations
+            else:
+                yield array("q",(seed + composed.offsets[bisect_right(composed.bounds,seed)] for seed in chunk))
+    
+    def map_many(self,seeds:Iterable[int],chunk_size:int = BULK_CHUNK) -> array:
+        """ The location of every seed, in order, as one array("q"). """
+        retval = array("q")
+        for chunk in self.map_chunks(seeds,chunk_size):
+            retval.extend(chunk)
+        return retval
+    
     def map_range(self, rng:MappedRange) -> list[MappedRange]:
-        retval = [rng]
+        return self.map_ranges([rng])
+    
+    def map_ranges(self,ranges:list[MappedRange]) -> list[MappedRange]:
+        """ Maps all ranges through each map in turn. The ranges are merged after
+        every map, so their number stays bounded by the number of mappings. """
         for mapping in self.mappings:
-            temp = [mapping.map_range(r) for r in retval]
-            retval = flatten_list(temp)
-        return retval
+            ranges = mapping.map_ranges(ranges)
+        return ranges
     
     def __repr__(self) -> str:
         return f"seeds: {' '.join(str(seed) for seed in self.seeds)}\n{NWLN.join(repr(mapping) for mapping in self.mappings)}"
@@ -140,7 +318,7 @@ def parse_input(file_path = INPUT_PATH):
             for line in input_file:
                 if line.strip() == "":
                     #blank line stops mapping block
-                    mapsets.append(MapSet(type_,tuple(mappings)))
+                    mapsets.append(MapSet.from_mappings(type_,mappings))
                     mappings.clear()
                     type_ = ""
                     continue
@@ -151,7 +329,7 @@ def parse_input(file_path = INPUT_PATH):
                 #line of mapping block
                 mappings.append(Mapping(*(int(x) for x in line.strip().split(" "))))
             if type_ != "":
-                mapsets.append(MapSet(type_,tuple(mappings)))
+                mapsets.append(MapSet.from_mappings(type_,mappings))
             return Almanac(seeds,tuple(mapsets))
             
 def solution_one(parsed_input:Almanac) -> str:
@@ -167,14 +345,8 @@ def solution_two(parsed_input:Almanac) -> str:
         for start,end
         in zip(parsed_input.seeds[::2],parsed_input.seeds[1::2])
     ]
-    final_ranges = [
-        parsed_input.map_range(r)
-        for r
-        in starting_ranges
-    ]
-    
-    
-    return str(min(flatten_list(final_ranges),key=lambda r:r.r_start).r_start)
+    # The mapped ranges come back sorted, so the first one holds the lowest location.
+    return str(parsed_input.map_ranges(starting_ranges)[0].r_start)
 
 def solve_day() -> tuple[float,float,float]:
     times = [0,0,0,0]
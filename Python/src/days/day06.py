@@ -1,7 +1,9 @@
+from math import isqrt
 from pathlib import Path
 from time import perf_counter_ns
-from typing import NamedTuple
+from typing import Iterable, NamedTuple
 import re
+import sys
 
 INPUT_NAME = "day06.txt"
 INPUT_PATH = Path(__file__).parent.parent.parent / "input" / INPUT_NAME
@@ -14,22 +16,44 @@ class RaceStats(NamedTuple):
     def __repr__(self) -> str:
         return f"{self.time=}; {self.distance=}"
     
+    def wins(self,hold:int) -> bool:
+        return hold * (self.time - hold) > self.distance
+    
     def minimum_win(self) -> int:
-        for i in range(self.time+1):
-            time_left = self.time - i
-            speed = i
-            if time_left * speed > self.distance:
-                return i
-        return -1
+        """ The shortest hold that wins, or -1 if no hold does. The holds that win
+        lie strictly between the roots of h^2 - time*h + distance = 0, and the
+        integer square root puts a guess within one of the lower root. The
+        guess is then nudged onto the exact bound, using integers only, so it
+        holds for races of any size. """
+        discriminant = self.time * self.time - 4 * self.distance
+        if discriminant < 0:
+            return -1
+        if self.time < 0 or not self.wins(self.time // 2):
+            return -1 # Not even the best hold beats the record.
+        hold = max((self.time - isqrt(discriminant)) // 2,0)
+        while hold > 0 and self.wins(hold - 1):
+            hold -= 1
+        while not self.wins(hold):
+            hold += 1
+        return hold
     
     def maximum_win(self) -> int:
-        for i in range(self.time,-1,-1):
-            time_left = self.time - i
-            speed = i
-            if time_left * speed > self.distance:
-                return i
-        return -1
+        """ The longest hold that wins, or -1 if no hold does. The distance is
+        symmetric around half the race time, so this mirrors minimum_win. """
+        hold = self.minimum_win()
+        if hold == -1:
+            return -1
+        return self.time - hold
+    
+    def winning_count(self) -> int:
+        hold = self.minimum_win()
+        if hold == -1:
+            return 0
+        return self.time - 2 * hold + 1
 
+def winning_counts(races:Iterable[RaceStats]) -> list[int]:
+    """ The number of winning holds of every race, in order. """
+    return [race.winning_count() for race in races]
 
 def parse_line(line:str):
     """ Parse one line of the input into an 'object' for the solution.
@@ -53,11 +77,8 @@ def solution_one(parsed_input:tuple[RaceStats,...]) -> str:
     """ Takes the (parsed) input of the puzzle and uses it to solve for
     the first star of the day. """
     result = 1
-    for race in parsed_input:
-        top = race.maximum_win()
-        bot = race.minimum_win()
-        result *= (top - bot)+1
-        #print(f"race {race!r}; {top=} - {bot=}")
+    for count in winning_counts(parsed_input):
+        result *= count
     return str(result)
 
 def solution_two(parsed_input:tuple[RaceStats,...]) -> str:
@@ -69,9 +90,7 @@ def solution_two(parsed_input:tuple[RaceStats,...]) -> str:
         total_distance += str(race.distance)
     real_race = RaceStats(int(total_time),int(total_distance))
     print(repr(real_race))
-    real_min = real_race.minimum_win()
-    real_max = real_race.maximum_win()
-    return str((real_max - real_min)+1)
+    return str(real_race.winning_count())
 
 def solve_day() -> tuple[float,float,float]:
     times = [0,0,0,0]
@@ -90,5 +109,23 @@ def solve_day() -> tuple[float,float,float]:
     print(f"=== Day 06 ===\n  · Part 1: {result_one}\n  · Part 2: {result_two}\n  · Time: {time_parse}; {time_one}; {time_two}; {time_total}")
     return time_one, time_two, time_total
 
+def benchmark_lengths(digits:Iterable[int] = (2,4,8,16,32,64,128,256),races:int = 1000):
+    """ Times the solver on races whose time has the given number of digits.
+    The cost per race only grows with the number of digits (through the
+    big-integer arithmetic), not with the race time itself. """
+    print(f"=== Day 06 solver cost by race length ({races} races each) ===")
+    for digit_count in digits:
+        lowest = 10 ** (digit_count - 1)
+        times = [lowest + i % (9 * lowest) for i in range(races)]
+        # Every other race can not be won: its record is the best possible hold.
+        batch = [RaceStats(time,time * time // (5 if i % 2 else 4)) for i,time in enumerate(times)]
+        start = perf_counter_ns()
+        winning_counts(batch)
+        per_race = (perf_counter_ns() - start) / races
+        print(f"  · {digit_count:>3} digits: {per_race:>9.1f} ns per race")
+
 if __name__ == "__main__":
-    solve_day()
+    if "--bench" in sys.argv:
+        benchmark_lengths()
+    else:
+        solve_day()
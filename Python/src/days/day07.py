@@ -1,58 +1,47 @@
+from array import array
+from operator import attrgetter
 from pathlib import Path
 from time import perf_counter_ns
-from typing import NamedTuple
-from collections import Counter
+from typing import Iterable, NamedTuple
 
 INPUT_NAME = "day07.txt"
 INPUT_PATH = Path(__file__).parent.parent.parent / "input" / INPUT_NAME
 CARD_ORDER = {rank:value for value,rank in enumerate("23456789TJQKA")}
 CARD_JOKER = {rank:value for value,rank in enumerate("J23456789TQKA")}
+# The cards as base-13 digits, so a hand can be read as one number with int(..., 13).
+DIGITS_ORDER = str.maketrans({rank:"0123456789abc"[value] for rank,value in CARD_ORDER.items()})
+DIGITS_JOKER = str.maketrans({rank:"0123456789abc"[value] for rank,value in CARD_JOKER.items()})
+CARD_COUNT = 5
+# The hand type, by the sum of the squared counts of each card in the hand.
+# Summing the counts of the card in every position gives the same number.
+HAND_TYPES = {
+    25:6, # 5 of a kind
+    17:5, # 4 of a kind
+    13:4, # Full house
+    11:3, # 3 of a kind
+    9:2, # Two pairs
+    7:1, # Single pair
+    5:0, # Any
+}
+TYPE_TABLE = tuple(HAND_TYPES.get(signature,-1) for signature in range(CARD_COUNT ** 2 + 1))
+# Strength keys are the hand type followed by the cards, as base-13 digits.
+TYPE_WEIGHT = 13 ** CARD_COUNT
+KEY_SPACE = len(HAND_TYPES) * TYPE_WEIGHT
+RADIX_BITS = 11
+RADIX_PASSES = -(-(KEY_SPACE - 1).bit_length() // RADIX_BITS)
 
 def hand_rank(hand:str) -> int:
-    counts = Counter(hand)
-    matches = sorted((x for x in counts.values()),reverse=True)
-    if matches == [5]: #5 of a kind!?
-        return 6
-    if matches == [4,1]: #4 of a kind
-        return 5
-    if matches == [3,2]: #Full house!
-        return 4
-    if matches == [3,1,1]: #3 of a kind
-        return 3
-    if matches == [2,2,1]: #Two pairs
-        return 2
-    if matches == [2,1,1,1]: #single pair
-        return 1
-    return 0 #Any
+    return TYPE_TABLE[sum(hand.count(card) for card in hand)]
 
 def joker_rank(hand:str) -> int:
-    counts = Counter(hand)
-    jokers = counts.get("J",0)
-    matches = sorted((y for x,y in counts.items() if x != "J"),reverse=True)
-    
-    if jokers == 5:
+    others = hand.replace("J","")
+    if others == "":
         return 6 # 5 of a kind
-    
-    if len(matches) == 1:
-        if matches[0] + jokers == 5:
-            return 6 # 5 of a kind, again?
-        
-    if len(matches) == 2:
-        if matches[0] + jokers == 4:
-            return 5 # 4 of a kind!
-        if (matches == [2,2] and jokers == 1) or matches == [3,2]:
-            return 4 # Full house!
-    
-    if len(matches) == 3:
-        if matches[1] == 1 and matches[2] == 1:
-            return 3 # 3 of a kind.
-        if matches == [2,2,1]:
-            return 2 # two pairs.
-        
-    if len(matches) == 4:
-        return 1 # single pair.
-    
-    return 0 #Any
+    # Jokers always do best joining the most common other card.
+    jokers = len(hand) - len(others)
+    counts = [others.count(card) for card in others]
+    most = max(counts)
+    return TYPE_TABLE[sum(counts) - most * most + (most + jokers) ** 2]
 
 
 class CardHand(NamedTuple):
@@ -60,13 +49,11 @@ class CardHand(NamedTuple):
     bid:int
     rank:int
     joker_rank:int
+    strength:int
+    joker_strength:int
 
     def hand_strength(self,jokers=False) -> int:
-        running_total = 0
-        for position,character in enumerate(self.cards[::-1]):
-            running_total += (13 ** position) * (CARD_JOKER[character] if jokers else CARD_ORDER[character])
-        running_total += (13 ** (len(self.cards)+1)) * (self.joker_rank if jokers else self.rank)
-        return running_total
+        return self.joker_strength if jokers else self.strength
     
     def __repr__(self) -> str:
         return f"{self.cards},{self.bid}. Rank {self.rank}; Strength {self.hand_strength()}/{self.hand_strength(True)}"
@@ -76,7 +63,89 @@ class CardHand(NamedTuple):
         parts = line.split(" ")
         rank = hand_rank(parts[0])
         j_rank = joker_rank(parts[0])
-        return CardHand(parts[0],int(parts[1]),rank,j_rank)
+        strength = rank * TYPE_WEIGHT + int(parts[0].translate(DIGITS_ORDER),13)
+        j_strength = j_rank * TYPE_WEIGHT + int(parts[0].translate(DIGITS_JOKER),13)
+        return CardHand(parts[0],int(parts[1]),rank,j_rank,strength,j_strength)
+
+def radix_order(hands:Iterable[CardHand],jokers:bool = False) -> list[CardHand]:
+    """ Orders the hands from weakest to strongest with a least significant digit
+    radix sort over their strength keys, which takes linear time. Hands of equal
+    strength keep their order. """
+    key = attrgetter("joker_strength" if jokers else "strength")
+    mask = (1 << RADIX_BITS) - 1
+    ordered = list(hands)
+    if len(ordered) < 1 << RADIX_BITS:
+        return sorted(ordered,key=key) # Too few hands to fill the buckets.
+    for shift in range(0,RADIX_PASSES * RADIX_BITS,RADIX_BITS):
+        buckets = [[] for _ in range(1 << RADIX_BITS)]
+        for hand in ordered:
+            buckets[key(hand) >> shift & mask].append(hand)
+        ordered = [hand for bucket in buckets for hand in bucket]
+    return ordered
+
+def total_winnings(ordered_cards:list[CardHand]) -> int:
+    return sum(card.bid * order for order,card in enumerate(ordered_cards,start=1))
+
+class Fenwick:
+    """ Fenwick tree over the strength keys, keeping both a count of hands and a
+    sum of their bids per key. """
+    def __init__(self,size:int = KEY_SPACE) -> None:
+        self.size = size
+        self.counts = array("q",bytes(8 * (size + 1)))
+        self.sums = array("q",bytes(8 * (size + 1)))
+
+    def add(self,key:int,bid:int):
+        i = key + 1
+        while i <= self.size:
+            self.counts[i] += 1
+            self.sums[i] += bid
+            i += i & -i
+
+    def prefix(self,key:int) -> tuple[int,int]:
+        """ The number of hands with a key below the given one, and their bids. """
+        count,total = 0,0
+        i = key
+        while i > 0:
+            count += self.counts[i]
+            total += self.sums[i]
+            i -= i & -i
+        return count,total
+
+class HandRanking:
+    """ Keeps the hands seen so far ranked, for hands that arrive one at a time.
+    Inserting a hand, finding the rank of a strength, and the total winnings
+    all take log time in the size of the key space. A new hand ranks just above
+    the hands of equal strength already inserted, like the stable sort in
+    radix_order. The trees take about 40 MiB per ranking. """
+    def __init__(self,jokers:bool = False) -> None:
+        self.jokers = jokers
+        self.tree = Fenwick()
+        self.size = 0
+        self.bid_total = 0
+        self.winnings = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def insert(self,hand:CardHand) -> int:
+        """ Adds the hand and returns its rank. Every stronger hand moves up a
+        rank, which adds their bids to the winnings once more. """
+        key = hand.hand_strength(self.jokers)
+        count,bids = self.tree.prefix(key + 1)
+        rank = count + 1
+        self.winnings += hand.bid * rank + (self.bid_total - bids)
+        self.tree.add(key,hand.bid)
+        self.size += 1
+        self.bid_total += hand.bid
+        return rank
+
+    def rank_of(self,hand:CardHand) -> int:
+        """ The rank of the weakest inserted hand as strong as the given one, or
+        the rank the hand would get if there is none. """
+        return self.tree.prefix(hand.hand_strength(self.jokers))[0] + 1
+
+    def total_winnings(self) -> int:
+        return self.winnings
         
 def parse_line(line:str) -> CardHand|None:
     """ Parse one line of the input into an 'object' for the solution.
@@ -98,16 +167,12 @@ def parse_input(file_path = INPUT_PATH):
 def solution_one(parsed_input:tuple[CardHand,...]) -> str:
     """ Takes the (parsed) input of the puzzle and uses it to solve for
     the first star of the day. """
-    ordered_cards = sorted(parsed_input,key=lambda x: x.hand_strength())
-    total_winnings = sum(card.bid * order for order,card in enumerate(ordered_cards,start = 1))
-    return str(total_winnings)
+    return str(total_winnings(radix_order(parsed_input)))
 
 def solution_two(parsed_input:tuple[CardHand,...]) -> str:
     """ Takes the (parsed) input of the puzzle and uses it to solve for
     the second star of the day. """
-    ordered_cards = sorted(parsed_input,key=lambda x: x.hand_strength(True))
-    total_winnings = sum(card.bid * order for order,card in enumerate(ordered_cards,start=1))
-    return str(total_winnings)
+    return str(total_winnings(radix_order(parsed_input,True)))
 
 def solve_day() -> tuple[float,float,float]:
     times = [0,0,0,0]
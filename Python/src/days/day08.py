@@ -1,8 +1,9 @@
+from array import array
 from pathlib import Path
 from time import perf_counter_ns
 from typing import NamedTuple
-from itertools import cycle
-from math import lcm
+from math import gcd
+from operator import itemgetter
 import re
 
 INPUT_NAME = "day08.txt"
@@ -25,18 +26,162 @@ class PathStep(NamedTuple):
         return f"{self.name} = ({self.left},{self.right})"
 
 class TravelMap(NamedTuple):
+    """ The map, with the nodes also compiled to integers: node i is names[i],
+    and its neighbours are left[i] and right[i]. jump[i] is where a full pass
+    over the instructions from node i ends up, and lifting[k] is where 2^k full
+    passes end up; those levels are added as larger step counts need them. """
     instructions:str
     steps:dict[str,PathStep]
+    names:tuple[str,...]
+    index:dict[str,int]
+    left:array
+    right:array
+    jump:array
+    lifting:list[array]
     
-class LoopData(NamedTuple):
-    start_to_exit:int
-    exit_to_exit:int
+    @classmethod
+    def compile(cls,instructions:str,steps:dict[str,PathStep]) -> "TravelMap":
+        names = tuple(steps)
+        index = {name:i for i,name in enumerate(names)}
+        left = array("i",(index[step.left] for step in steps.values()))
+        right = array("i",(index[step.right] for step in steps.values()))
+        # Follow the instructions from every node at once, one instruction at a time.
+        current = tuple(range(len(names)))
+        for instruction in instructions:
+            if len(current) < 2:
+                current = tuple((left if instruction == "L" else right)[x] for x in current)
+            else:
+                current = itemgetter(*current)(left if instruction == "L" else right)
+        jump = array("i",current)
+        return TravelMap(instructions,steps,names,index,left,right,jump,[jump])
     
-    def steps_to_exit(self,steps_taken:int) -> int:
-        if steps_taken < self.start_to_exit:
-            return self.start_to_exit - steps_taken
-        steps_taken -= self.start_to_exit
-        return steps_taken % self.exit_to_exit
+    def moves(self) -> tuple[array,...]:
+        """ The neighbour array to use for each instruction. """
+        return tuple(self.left if instruction == "L" else self.right for instruction in self.instructions)
+    
+    def after_passes(self,node:int,passes:int) -> int:
+        """ The node reached after following all instructions `passes` times. """
+        level = 0
+        while passes > 0:
+            if level == len(self.lifting):
+                previous = self.lifting[-1]
+                self.lifting.append(array("i",(previous[x] for x in previous)))
+            if passes & 1:
+                node = self.lifting[level][node]
+            passes >>= 1
+            level += 1
+        return node
+    
+    def position_after(self,start:str,steps:int) -> str:
+        """ The name of the node reached after taking the given number of steps
+        from the start, jumping over whole passes of the instructions. """
+        passes,remainder = divmod(steps,len(self.instructions))
+        node = self.after_passes(self.index[start],passes)
+        moves = self.moves()
+        for i in range(remainder):
+            node = moves[i][node]
+        return self.names[node]
+    
+class GhostCycle(NamedTuple):
+    """ When one ghost is on an exit. Before cycle_start, that is at the steps
+    in tail_exits; from cycle_start on the walk repeats every `period` steps,
+    with the exits at cycle_exits (steps in the first period). """
+    tail_exits:tuple[int,...]
+    cycle_start:int
+    period:int
+    cycle_exits:tuple[int,...]
+    
+    def is_exit(self,steps_taken:int) -> bool:
+        if steps_taken < self.cycle_start:
+            return steps_taken in self.tail_exits
+        return self.cycle_start + (steps_taken - self.cycle_start) % self.period in self.cycle_exits
+
+def brent(function,start:int) -> tuple[int,int]:
+    """ Brent's cycle detection: returns the number of applications of the
+    function before the values start repeating, and the length of the cycle. """
+    power = length = 1
+    tortoise,hare = start,function(start)
+    while tortoise != hare:
+        if power == length:
+            tortoise = hare
+            power *= 2
+            length = 0
+        hare = function(hare)
+        length += 1
+    tortoise = hare = start
+    for _ in range(length):
+        hare = function(hare)
+    tail = 0
+    while tortoise != hare:
+        tortoise = function(tortoise)
+        hare = function(hare)
+        tail += 1
+    return tail,length
+
+def ghost_cycle(travel_map:TravelMap,start:int,exits:bytearray) -> GhostCycle:
+    """ Finds the cycle of the walk from the start over (node, instruction index)
+    states. Every such walk passes index 0 once per pass over the instructions,
+    so the cycle is found over the nodes at the start of each pass, using the
+    jump table. The states then repeat every `length` passes, from the end of
+    the `tail` passes on; walking that far once finds every exit. """
+    tail,length = brent(travel_map.jump.__getitem__,start)
+    moves = travel_map.moves()
+    cycle_start = tail * len(moves)
+    period = length * len(moves)
+    found = list()
+    node = start
+    for step in range(cycle_start + period):
+        if exits[node]:
+            found.append(step)
+        node = moves[step % len(moves)][node]
+    return GhostCycle(
+        tuple(x for x in found if x < cycle_start),cycle_start,period,
+        tuple(x for x in found if x >= cycle_start)
+    )
+
+def combine(first:tuple[int,int],second:tuple[int,int]) -> tuple[int,int]|None:
+    """ Generalized Chinese remainder theorem: combines x = a (mod m) and
+    x = b (mod n) into one congruence modulo lcm(m,n), or None if the two
+    can never both hold. The moduli need not be coprime. """
+    a,m = first
+    b,n = second
+    divisor = gcd(m,n)
+    if (b - a) % divisor != 0:
+        return None
+    k = ((b - a) // divisor * pow(m // divisor,-1,n // divisor)) % (n // divisor)
+    modulus = m // divisor * n
+    return (a + m * k) % modulus,modulus
+
+def first_common_exit(cycles:list[GhostCycle]) -> int:
+    """ The first step at which every ghost is on an exit, or -1 if there is
+    none. Steps before every ghost is in its cycle are checked one by one
+    against the exits of the ghost that takes longest to get there; after
+    that, every ghost is periodic and the congruences are combined. Without
+    any ghosts, all of them are trivially on an exit from the start: 0. """
+    if not cycles:
+        return 0
+    settled = max(cycles,key=lambda x:x.cycle_start)
+    early = [x for x in settled.tail_exits if all(ghost.is_exit(x) for ghost in cycles)]
+    if early:
+        return min(early)
+    congruences = [(0,1)]
+    for ghost in cycles:
+        # All congruences so far share a modulus, and only the exits that agree
+        # with a congruence modulo the gcd of the two moduli can combine with it.
+        divisor = gcd(congruences[0][1],ghost.period)
+        options:dict[int,list[int]] = dict()
+        for x in ghost.cycle_exits:
+            options.setdefault(x % divisor,list()).append(x % ghost.period)
+        congruences = [
+            combine(congruence,(remainder,ghost.period))
+            for congruence in congruences
+            for remainder in options.get(congruence[0] % divisor,())
+        ]
+        if not congruences:
+            return -1
+    start = settled.cycle_start
+    # The smallest x >= start for each remainder.
+    return min(a + -(-(start - a) // m) * m if a < start else a for a,m in congruences)
 
 def parse_line(line:str):
     """ Parse one line of the input into an 'object' for the solution.
@@ -54,81 +199,36 @@ def parse_input(file_path = INPUT_PATH):
         with open(file_path) as input_file:
             instructions = next(input_file).strip()
             parsed_steps = {step.name:step for step in filter(lambda x: x is not None, (parse_line(line) for line in input_file))}
-            return TravelMap(instructions,parsed_steps)
+            return TravelMap.compile(instructions,parsed_steps)
 
 def solution_one(parsed_input:TravelMap) -> str:
     """ Takes the (parsed) input of the puzzle and uses it to solve for
     the first star of the day. """
-    current = parsed_input.steps["AAA"]
+    moves = parsed_input.moves()
+    current = parsed_input.index["AAA"]
+    target = parsed_input.index["ZZZ"]
     stepcount = 0
-    instruction = cycle(parsed_input.instructions)
-    while current.name != "ZZZ":
+    while current != target:
+        current = moves[stepcount % len(moves)][current]
         stepcount += 1
-        step = next(instruction)
-        current = parsed_input.steps[current.get_next(step)]
 
     return str(stepcount)
 
 def solution_two(parsed_input:TravelMap) -> str:
     """ Takes the (parsed) input of the puzzle and uses it to solve for
     the second star of the day. """
-    # Tried doing the solution one *thing* in parallel, left it running for over half an hour
-    # without getting a solve. Time to get creative.
-
-    # There is a limited number of starting points, and a limited number of end points. Find both.
-    starting_points = set(step.name for step in parsed_input.steps.values() if step.name[2] == "A")
-    ending_points = set(step.name for step in parsed_input.steps.values() if step.name[2] == "Z")
-    
-    # Each node points to two other nodes. In other words, it is *possible* that a node only points to itself
-    # and never another node, but it is *impossible* to make a node point to "nothing."
-    
-    # The input has a set of nodes that is defined as the "starting nodes" for the puzzle. In other words, there
-    # is an axiomatic set of nodes that are 'valid' to begin from, and all other nodes in the set can safely be
-    # disregarded as potential starting points.
-    
-    # The input is of finite length. In other words, if every node in a set of finite length points to two other
-    # nodes in the same set, it is impossible to create an input that features no loops, and it is impossible to
-    # create an input where following a fixed series of left-right-instructions will not eventually lead to a loop.
-    
-    # The input also includes a fixed series of left-right-instructions.
-
-    # From each starting point, there will eventually be a stable loop that includes at least one "terminus" node,
-    # where the terminus node is the node that will be visited twice, after some finite number of times of 
-    # following the entire given series of left-right-instructions.
-    
-    # That stable loop can be defined as "some number of iterations of the instruction set (setup) followed by 
-    # another number of iterations of the instruction set (loop)"
-    # For each starting point, start following the instructions until you run into yourself.
-    
-    loop_lengths:list[LoopData] = list()
-    
-    for start in starting_points:
-        termini = list() # will contain the names of all locations arrived at after completing a full
-        # run of the instructions.
-        current = start
-        # Find the point where the loop meets itself at the start.
-        while current not in termini:
-            termini.append(current)
-            for instruction in parsed_input.instructions:
-                current = parsed_input.steps[current].get_next(instruction)
-        loop_steps = (len(parsed_input.instructions) * (len(termini)-termini.index(current))) # steps from loop-point to loop-point
-        # Track how many steps it takes while in the loop, to reach a valid end-point.
-        start_to_exit = 0
-        current = start
-        instr_iter = cycle(parsed_input.instructions)
-        while current not in ending_points:
-            start_to_exit += 1
-            current = parsed_input.steps[current].get_next(next(instr_iter))
-        loop_lengths.append(LoopData(start_to_exit,loop_steps))
-        print(f"Loop analysis starting from {start} complete. Start-to-exit steps: {start_to_exit}. exit-to-exit steps: {loop_steps}.")       
-    # Relevant data parsed out. Next step: Figure out the answer.
-    # Full disclosure, I had to look this one up here. Also, I don't really understand how this one works :(
+    # Every ghost walks into a cycle of (node, instruction index) states sooner or
+    # later. Find each cycle and where the exits lie in and before it, then find
+    # the first step where all ghosts agree.
+    exits = bytearray(name[2] == "Z" for name in parsed_input.names)
+    cycles:list[GhostCycle] = list()
     
-    final_stepcount = 1
-    for dat in loop_lengths:
-        final_stepcount = lcm(final_stepcount,dat.start_to_exit)
+    for start in (name for name in parsed_input.names if name[2] == "A"):
+        ghost = ghost_cycle(parsed_input,parsed_input.index[start],exits)
+        cycles.append(ghost)
+        print(f"Loop analysis starting from {start} complete. Cycle starts at step {ghost.cycle_start}, repeats every {ghost.period} steps, with {len(ghost.tail_exits) + len(ghost.cycle_exits)} exits.")
     
-    return str(final_stepcount)
+    return str(first_common_exit(cycles))
 
 def solve_day() -> tuple[float,float,float]:
     times = [0,0,0,0]
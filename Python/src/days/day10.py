@@ -1,12 +1,12 @@
 from pathlib import Path
-from time import perf_counter_ns
+from time import perf_counter, perf_counter_ns
 from typing import NamedTuple
 import random
-import tkinter as tk
-import tkinter.ttk as ttk
+import sys
 
 INPUT_NAME = "day10.txt"
 INPUT_PATH = Path(__file__).parent.parent.parent / "input" / INPUT_NAME
+GUI_FPS = 30
 
 class Coordinate(NamedTuple):
     h:int
@@ -20,14 +20,21 @@ class Coordinate(NamedTuple):
             self.with_offset(x,y) for x,y in ((1,0),(0,1),(-1,0),(0,-1)) if 0 <= self.h+x < max_x and 0 <= self.v+y < max_y
         )
     
-class GridGui(tk.Tk):
+class GridGui:
+    """ Optional visualization of the solve. tkinter is only imported once a
+    GridGui is made, and the window is only redrawn GUI_FPS times per second. """
     def __init__(self,pipe_grid:tuple[str,...], **kwargs) -> None:
+        import tkinter as tk
+        import tkinter.ttk as ttk
+
         self.grid_height = len(pipe_grid)
         self.grid_width = len(pipe_grid[0])
         self.tiles = [[0 for _ in range(self.grid_width)] for _ in range(self.grid_height)]
-        super().__init__(kwargs.get("screenName","Advent of Code 2023 day 10"))
+        self.root = tk.Tk(kwargs.get("screenName","Advent of Code 2023 day 10"))
+        self.frame_time = 1 / kwargs.get("fps",GUI_FPS)
+        self.last_frame = 0.0
         
-        root_frame = ttk.Frame(self,padding="5")
+        root_frame = ttk.Frame(self.root,padding="5")
         root_frame.configure(height=200, width=200)
         canvas1 = tk.Canvas(root_frame)
         canvas1.configure(height=5*self.grid_height, width=5*self.grid_width,border="-2")
@@ -86,6 +93,16 @@ class GridGui(tk.Tk):
         self.cursor = canvas1.create_rectangle(0,0,5,5,fill='',outline='')
         self.target = canvas1.create_oval(0,0,1,1,fill="",outline="")
 
+    def refresh(self,force=False):
+        """ Redraws the window, unless it was already redrawn less than a frame ago. """
+        now = perf_counter()
+        if force or now - self.last_frame >= self.frame_time:
+            self.root.update()
+            self.last_frame = now
+    
+    def mainloop(self):
+        self.root.mainloop()
+
     def in_grid(self,tile_x,tile_y) -> bool:
         return tile_x >= 0 and tile_x < self.grid_width and tile_y >= 0 and tile_y < self.grid_height
     
@@ -305,7 +322,7 @@ def solution_two(parsed_input:tuple[str,...],gui:GridGui=None) -> str:
         if gui is not None:
             gui.move_cursor(current.h,current.v)
             gui.move_target(to_fill[0].h,to_fill[0].v)
-            gui.update()
+            gui.refresh()
         while len(to_fill) > 0:
             current_fill = to_fill.pop()
             if current_fill not in inside_tiles and current_fill not in pipe_locations:
@@ -316,21 +333,25 @@ def solution_two(parsed_input:tuple[str,...],gui:GridGui=None) -> str:
     
     return str(len(inside_tiles))
 
-def solve_day() -> tuple[float,float,float]:
-    
+def solve_day(show_gui:bool=False) -> tuple[float,float,float]:
+    gui = None
+    if show_gui:
+        # Build the window before the clock starts; drawing every tile is slow.
+        gui = GridGui(parse_input(),screenName = "hello world")
+        gui.refresh(True)
     times = [0,0,0,0]
     times[0] = perf_counter_ns()
     parsed_input = parse_input()
-    gui = GridGui(parsed_input,screenName = "hello world")
-    gui.update()
     times[1] = perf_counter_ns()
     result_one = solution_one(parsed_input,gui)
-    gui.star_1["text"] = result_one
-    gui.update()
+    if gui is not None:
+        gui.star_1["text"] = result_one
+        gui.refresh(True)
     times[2] = perf_counter_ns()
     result_two = solution_two(parsed_input,gui)
-    gui.star_2["text"] = result_two
-    gui.update()
+    if gui is not None:
+        gui.star_2["text"] = result_two
+        gui.refresh(True)
     times[3] = perf_counter_ns()
 
     time_parse = (times[1] - times[0]) / 1_000_000
@@ -338,9 +359,9 @@ def solve_day() -> tuple[float,float,float]:
     time_two = (times[3] - times[2]) / 1_000_000
     time_total = (times[3] - times[0]) / 1_000_000
     print(f"=== Day 10 ===\n  · Part 1: {result_one}\n  · Part 2: {result_two}\n  · Time: {time_parse}; {time_one}; {time_two}; {time_total}")
-    gui.mainloop()
+    if gui is not None:
+        gui.mainloop()
     return time_one, time_two, time_total
 
 if __name__ == "__main__":
-
-    solve_day()
+    solve_day("--gui" in sys.argv)
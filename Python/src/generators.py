@@ -0,0 +1,210 @@
+""" Generators for synthetic puzzle inputs. Every generator takes a scale factor
+and a seeded random number generator, and returns the text of a valid input
+for that day. At scale 1 the inputs are about as large as the real ones. """
+from math import isqrt
+from random import Random
+from string import ascii_uppercase, digits
+
+DIGIT_WORDS = ("one","two","three","four","five","six","seven","eight","nine")
+NAME_CHARACTERS = digits + ascii_uppercase
+
+def day01(scale:int,rng:Random) -> str:
+    lines = []
+    for _ in range(1000 * scale):
+        parts = [rng.choice(digits[1:])]
+        for _ in range(rng.randint(1,8)):
+            kind = rng.random()
+            if kind < 0.3:
+                parts.append(rng.choice(digits[1:]))
+            elif kind < 0.6:
+                parts.append(rng.choice(DIGIT_WORDS))
+            else:
+                parts.append("".join(rng.choices("abcdefghijklmnopqrstuvwxyz",k=rng.randint(1,4))))
+        rng.shuffle(parts)
+        lines.append("".join(parts))
+    return "\n".join(lines) + "\n"
+
+def day02(scale:int,rng:Random) -> str:
+    lines = []
+    for game_id in range(1,100 * scale + 1):
+        hands = []
+        for _ in range(rng.randint(1,6)):
+            colours = rng.sample(("red","green","blue"),k=rng.randint(1,3))
+            hands.append(", ".join(f"{rng.randint(1,20)} {colour}" for colour in colours))
+        lines.append(f"Game {game_id}: {'; '.join(hands)}")
+    return "\n".join(lines) + "\n"
+
+def day03(scale:int,rng:Random) -> str:
+    # Rows get wider with the scale, so the per-row lookups get busier.
+    width,height = 140 * scale,140
+    rows = []
+    for y in range(height):
+        row = []
+        while len(row) < width:
+            kind = rng.random()
+            if kind < 0.12:
+                row.extend(str(rng.randint(1,999)))
+            elif kind < 0.17 and y < height - 1: # Like the real inputs, no parts on the last row.
+                row.append(rng.choice("*#+$/=%@&-"))
+            row.append(".")
+        rows.append("".join(row[:width]))
+    return "\n".join(rows) + "\n"
+
+def day04(scale:int,rng:Random) -> str:
+    lines = []
+    for card_id in range(1,200 * scale + 1):
+        winning = rng.sample(range(1,100),k=10)
+        # Keep the number of matches low, so the copies in part 2 stay reasonable.
+        found = rng.sample(winning,k=rng.choice((0,0,0,0,0,1,1,2,4)))
+        found.extend(rng.sample([x for x in range(1,100) if x not in winning],k=25-len(found)))
+        rng.shuffle(found)
+        lines.append(f"Card {card_id:>3}: {' '.join(f'{x:>2}' for x in winning)} | {' '.join(f'{x:>2}' for x in found)}")
+    return "\n".join(lines) + "\n"
+
+def day05(scale:int,rng:Random) -> str:
+    top = 1 << 32
+    seeds = []
+    for _ in range(10 * scale):
+        seeds.append(rng.randrange(top))
+        seeds.append(rng.randint(1,top >> 4))
+    blocks = [f"seeds: {' '.join(str(x) for x in seeds)}"]
+    steps = "seed soil fertilizer water light temperature humidity location".split(" ")
+    for source,dest in zip(steps,steps[1:]):
+        cuts = sorted(rng.sample(range(top),k=2 * 30 * scale))
+        lines = [f"{source}-to-{dest} map:"]
+        for start,end in zip(cuts[::2],cuts[1::2]):
+            lines.append(f"{rng.randrange(top - (end - start))} {start} {end - start}")
+        lines[1:] = rng.sample(lines[1:],k=len(lines)-1)
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks) + "\n"
+
+def day06(scale:int,rng:Random) -> str:
+    times,distances = [],[]
+    for _ in range(4 * scale):
+        time = rng.randint(7,99)
+        hold = rng.randint(1,time - 1)
+        times.append(time)
+        distances.append(rng.randint(0,hold * (time - hold) - 1))
+    return f"Time:     {' '.join(f'{x:>4}' for x in times)}\nDistance: {' '.join(f'{x:>4}' for x in distances)}\n"
+
+def day07(scale:int,rng:Random) -> str:
+    return "".join(f"{''.join(rng.choices('23456789TJQKA',k=5))} {rng.randint(1,1000)}\n" for _ in range(1000 * scale))
+
+def day08(scale:int,rng:Random) -> str:
+    # Node names are three characters, which caps the number of nodes; past that,
+    # only the instructions get longer. Every ghost walks a ring of its own with
+    # the exit at the end, so the distance to the first exit is also the loop length.
+    instructions = "".join(rng.choices("LR",k=263 * scale))
+    node_count = min(750 * scale,30_000)
+    names = [a + b + c for a in NAME_CHARACTERS for b in NAME_CHARACTERS for c in NAME_CHARACTERS if c not in "AZ"]
+    names = iter(rng.sample(names,k=node_count))
+    prefixes = rng.sample([a + b for a in NAME_CHARACTERS for b in NAME_CHARACTERS if a + b != "AA" and a + b != "ZZ"],k=5)
+    ghosts = [("AAA","ZZZ")] + [(prefix + "A",prefix + "Z") for prefix in prefixes]
+    ring_sizes = rng.sample([p for p in range(node_count // 16,node_count // 8) if all(p % d for d in range(2,isqrt(p) + 1))],k=len(ghosts))
+    nodes:dict[str,tuple[str,str]] = dict()
+    filler:list[str] = []
+    for (start,exit_),size in zip(ghosts,ring_sizes):
+        ring = [next(names) for _ in range(size - 1)] + [exit_]
+        nodes[start] = (ring[0],ring[0])
+        for here,there in zip(ring,ring[1:] + ring[:1]):
+            nodes[here] = (there,there)
+    filler.extend(names)
+    everything = list(nodes) + filler
+    for name in filler:
+        nodes[name] = (rng.choice(everything),rng.choice(everything))
+    lines = [f"{name} = ({left}, {right})" for name,(left,right) in nodes.items()]
+    rng.shuffle(lines)
+    return instructions + "\n\n" + "\n".join(lines) + "\n"
+
+def day09(scale:int,rng:Random) -> str:
+    lines = []
+    for _ in range(200 * scale):
+        coefficients = [rng.randint(-5,5) for _ in range(rng.randint(1,7))]
+        values = [sum(c * x ** power for power,c in enumerate(coefficients)) for x in range(21)]
+        lines.append(" ".join(str(v) for v in values))
+    return "\n".join(lines) + "\n"
+
+def day10(scale:int,rng:Random) -> str:
+    # The loop is the outline of a random skyline: along the tops of the columns
+    # from left to right, down the last column, back along the bottom and up the
+    # first column to S, which sits in the top left corner of the loop.
+    side = max(int(140 * scale ** 0.5),8)
+    left,right,bottom = 1,side - 2,side - 2
+    tops = [rng.randint(1,bottom - 1) for _ in range(left,right + 1)]
+    path = [(left,tops[0])]
+    for x in range(left + 1,right + 1):
+        y = tops[x - left - 1]
+        path.append((x,y))
+        target = tops[x - left] if x < right else bottom
+        step = 1 if target > y else -1
+        for y in range(y + step,target + step,step):
+            path.append((x,y))
+    for x in range(right - 1,left - 1,-1):
+        path.append((x,bottom))
+    for y in range(bottom - 1,tops[0],-1):
+        path.append((left,y))
+    shapes = {
+        frozenset("NS"):"|",frozenset("EW"):"-",frozenset("NE"):"L",
+        frozenset("NW"):"J",frozenset("SW"):"7",frozenset("SE"):"F"
+    }
+    def heading(a:tuple[int,int],b:tuple[int,int]) -> str:
+        return {(1,0):"E",(-1,0):"W",(0,1):"S",(0,-1):"N"}[(b[0] - a[0],b[1] - a[1])]
+    grid = [[rng.choice("|-LJ7F..") for _ in range(side)] for _ in range(side)]
+    for before,here,after in zip(path[-1:] + path[:-1],path,path[1:] + path[:1]):
+        grid[here[1]][here[0]] = shapes[frozenset(heading(here,before) + heading(here,after))]
+    start_x,start_y = path[0]
+    grid[start_y][start_x] = "S"
+    # Only the two loop pipes may connect to S.
+    grid[start_y][start_x - 1] = "."
+    grid[start_y - 1][start_x] = "."
+    return "\n".join("".join(row) for row in grid) + "\n"
+
+def day11(scale:int,rng:Random) -> str:
+    side = int(140 * scale ** 0.5)
+    empty_rows = set(rng.sample(range(side),k=side // 20))
+    empty_columns = set(rng.sample(range(side),k=side // 20))
+    rows = []
+    for y in range(side):
+        if y in empty_rows:
+            rows.append("." * side)
+            continue
+        rows.append("".join("#" if x not in empty_columns and rng.random() < 0.023 else "." for x in range(side)))
+    return "\n".join(rows) + "\n"
+
+def day12(scale:int,rng:Random) -> str:
+    lines = []
+    for _ in range(1000 * scale):
+        springs = "".join(rng.choices("#.",k=rng.randint(4,20)))
+        if "#" not in springs:
+            springs = "#" + springs[1:]
+        groups = [len(group) for group in springs.split(".") if group]
+        masked = "".join("?" if rng.random() < 0.5 else char for char in springs)
+        lines.append(f"{masked} {','.join(str(g) for g in groups)}")
+    return "\n".join(lines) + "\n"
+
+def day13(scale:int,rng:Random) -> str:
+    maps = []
+    for _ in range(100 * scale):
+        height,width = rng.randint(5,17),rng.randint(5,17)
+        mirror = rng.randint(1,height - 1)
+        rows:list[str] = []
+        for y in range(height):
+            reflected = 2 * mirror - 1 - y
+            if y >= mirror and reflected >= 0:
+                rows.append(rows[reflected])
+            else:
+                rows.append("".join(rng.choices("#.",k=width)))
+        if rng.random() < 0.5:
+            rows = ["".join(column) for column in zip(*rows)]
+        maps.append("\n".join(rows))
+    return "\n\n".join(maps) + "\n"
+
+GENERATORS = {
+    "01":day01,"02":day02,"03":day03,"04":day04,"05":day05,"06":day06,"07":day07,
+    "08":day08,"09":day09,"10":day10,"11":day11,"12":day12,"13":day13,
+}
+
+def generate(day:str,scale:int,seed:int = 0) -> str:
+    """ Generates the input for the given day ("01" to "13") at the given scale.
+    The same day, scale and seed always give the same input. """
+    return GENERATORS[day](scale,Random(f"{day}:{scale}:{seed}"))
@@ -0,0 +1,90 @@
+from hashlib import sha256
+from pathlib import Path
+from types import ModuleType
+import os
+import pickle
+import zlib
+
+CACHE_PATH = Path(__file__).parent.parent / ".cache" / "parsed"
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+class InputCache:
+    """ Stores the parsed input of each day on disk, so that the parse phase only
+    has to load it back when neither the input file nor the day's source changed.
+    Entries are pickled and compressed, and the least recently used entries are
+    evicted once the cache grows beyond `max_bytes`. """
+
+    def __init__(self,directory:Path = CACHE_PATH,max_bytes:int = MAX_CACHE_BYTES) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._source_hashes:dict[str,str] = dict()
+
+    def __repr__(self) -> str:
+        return f"Input cache at {self.directory}: {self.hits} hits, {self.misses} misses."
+
+    def source_hash(self,daymodule:ModuleType) -> str:
+        if daymodule.__name__ not in self._source_hashes:
+            with open(daymodule.__file__,"rb") as source_file:
+                self._source_hashes[daymodule.__name__] = sha256(source_file.read()).hexdigest()
+        return self._source_hashes[daymodule.__name__]
+
+    def key(self,daymodule:ModuleType,file_path:Path) -> str:
+        """ The cache key is a hash over the day's module name and source code,
+        and the contents of the input file. """
+        digest = sha256(daymodule.__name__.encode())
+        digest.update(self.source_hash(daymodule).encode())
+        with open(file_path,"rb") as input_file:
+            digest.update(input_file.read())
+        return digest.hexdigest()
+
+    def load(self,daymodule:ModuleType,file_path:Path|None = None):
+        """ Returns the parsed input for the day, either from the cache or by
+        calling the day's parse_input and storing the result. """
+        if file_path is None:
+            file_path = daymodule.INPUT_PATH
+        if not file_path.exists():
+            return daymodule.parse_input(file_path)
+        entry = self.directory / f"{self.key(daymodule,file_path)}.bin"
+        try:
+            with open(entry,"rb") as entry_file:
+                parsed_input = pickle.loads(zlib.decompress(entry_file.read()))
+            os.utime(entry)
+            self.hits += 1
+            return parsed_input
+        except (OSError,zlib.error,pickle.UnpicklingError,EOFError,AttributeError):
+            pass
+        self.misses += 1
+        parsed_input = daymodule.parse_input(file_path)
+        self.store(entry,parsed_input)
+        return parsed_input
+
+    def store(self,entry:Path,parsed_input):
+        self.directory.mkdir(parents=True,exist_ok=True)
+        data = zlib.compress(pickle.dumps(parsed_input,pickle.HIGHEST_PROTOCOL))
+        # Write to a temporary file first, so parallel workers never see half an entry.
+        temporary = entry.with_suffix(f".{os.getpid()}.tmp")
+        with open(temporary,"wb") as entry_file:
+            entry_file.write(data)
+        os.replace(temporary,entry)
+        self.evict()
+
+    def evict(self):
+        """ Removes the least recently used entries until the cache fits in its size limit. """
+        entries = list()
+        for entry in self.directory.glob("*.bin"):
+            try:
+                entries.append((entry.stat(),entry))
+            except FileNotFoundError:
+                continue # Evicted by another worker in the meantime.
+        total = sum(stat.st_size for stat,_ in entries)
+        for stat,entry in sorted(entries,key=lambda x:x[0].st_mtime_ns):
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= stat.st_size
+
+    def clear(self):
+        for entry in self.directory.glob("*.bin"):
+            entry.unlink(missing_ok=True)
@@ -1,85 +1,337 @@
 from types import ModuleType
-from days import day01,day02,day03,day04,day05
-from days import day06,day07,day08,day09,day10
-from days import day11,day12,day13,day14,day15
-from days import day16,day17,day18,day19,day20
-from days import day21,day22,day23,day24,day25
+from typing import TYPE_CHECKING, NamedTuple
 
 import sys
-from time import perf_counter_ns
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from contextlib import redirect_stdout
+from importlib import import_module
+from importlib.util import find_spec
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter_ns, process_time_ns
+
+from input_cache import InputCache
+
+if TYPE_CHECKING:
+    import bench # Imported where it is used, to keep start-up fast.
+
+DAYS_PACKAGE = "days"
+IMPORT_TIMES:dict[str,float] = dict()
+
+def day_module_name(name:str) -> str:
+    """ Turns a day as given on the command line ("1", "01", ...) into the name
+    of its module, without importing it. Exits if there is no such day. """
+    if name.isdigit():
+        module_name = f"{DAYS_PACKAGE}.day{int(name):0>2}"
+        if find_spec(module_name) is not None:
+            return module_name
+    print(f"Day '{name}' is not a valid day.")
+    sys.exit(1)
+
+def load_module(module_name:str) -> ModuleType:
+    """ Imports the given day module on demand, and remembers how long the
+    first import took (in milliseconds). """
+    start = perf_counter_ns()
+    module = import_module(module_name)
+    IMPORT_TIMES.setdefault(module_name,(perf_counter_ns() - start) / 1_000_000)
+    return module
 
 def day_module(name:str) -> ModuleType:
-    match name:
-        case "1" | "01":
-            return day01
-        case "2" | "02":
-            return day02
-        case "3" | "03":
-            return day03
-        case "4" | "04":
-            return day04
-        case "5" | "05":
-            return day05
-        case "6" | "06":
-            return day06
-        case "7" | "07":
-            return day07
-        case "8" | "08":
-            return day08
-        case "9" | "09":
-            return day09
-        case "10":
-            return day10
-        case "11":
-            return day11
-        case "12":
-            return day12
-        case "13":
-            return day13
-        case "14":
-            return day14
-        case "15":
-            return day15
-        case "16":
-            return day16
-        case "17":
-            return day17
-        case "18":
-            return day18
-        case "19":
-            return day19
-        case "20":
-            return day20
-        case "21":
-            return day21
-        case "22":
-            return day22
-        case "23":
-            return day23
-        case "24":
-            return day24
-        case "25":
-            return day25
-        case _ as x:
-            print(f"Day '{x}' is not a valid day.")
+    return load_module(day_module_name(name))
+
+class RunOptions(NamedTuple):
+    cache:InputCache|None = None
+    memory:bool = False
+    profile_dir:Path|None = None
+
+    def plain(self) -> bool:
+        return self.cache is None and not self.memory and self.profile_dir is None
+
+def solve(module_name:str,options:RunOptions=RunOptions()) -> tuple[float,float,float]:
+    """ Runs the named day. Normally this is just the day's solve_day(); with any
+    of the options set, the phases are run here instead so that parsing can go
+    through the cache and every phase can be tracked or profiled. """
+    daymodule = load_module(module_name)
+    if options.plain():
+        return daymodule.solve_day()
+    import bench # Only needed for the options; loading it slows down plain runs.
+    run = bench.run_phases(daymodule,cache=options.cache,quiet=False,memory=options.memory,profile_dir=options.profile_dir)
+    time_parse,time_one,time_two = run.times
+    time_total = time_parse + time_one + time_two
+    print(f"=== Day {module_name[-2:]} ===\n  · Part 1: {run.result_one}\n  · Part 2: {run.result_two}\n  · Time: {time_parse}; {time_one}; {time_two}; {time_total}")
+    if run.memory is not None:
+        print("  · Memory:")
+        for phase,usage in zip(bench.PHASES,run.memory):
+            print(f"    - {phase}: {usage!r}")
+            for site in usage.top_sites:
+                print(f"        {site}")
+    if run.profiles is not None:
+        print("  · Profile:")
+        for phase,profile in zip(bench.PHASES,run.profiles):
+            print(f"    - {phase}: {profile.stats_path}")
+            for function in profile.hot_functions:
+                print(f"        {function}")
+    return time_one, time_two, time_total
+
+def solve_in_worker(module_name:str,options:RunOptions=RunOptions()) -> tuple[str,tuple[float,float,float],float,float]:
+    """ Runs the named day in the current process. Anything the day prints is
+    captured and returned, so the parent process can print the days in order.
+    Also returns the CPU time spent on the day and the time it took to import
+    the module, both in milliseconds. """
+    output = StringIO()
+    cpu_start = process_time_ns()
+    with redirect_stdout(output):
+        result = solve(module_name,options)
+    cpu_time = (process_time_ns() - cpu_start) / 1_000_000
+    return output.getvalue(),result,cpu_time,IMPORT_TIMES[module_name]
+
+def report_import_times(budget:float|None) -> bool:
+    """ Prints how long each day module took to import. Returns False if the
+    total went over the given budget (in milliseconds). """
+    total = sum(IMPORT_TIMES.values())
+    print("Import times:")
+    for module_name,import_time in IMPORT_TIMES.items():
+        print(f"  · {module_name}: {import_time}")
+    print(f"  · Total: {total}" + ("" if budget is None else f" (budget {budget})"))
+    return budget is None or total <= budget
+
+def expand_days(days:list[str]) -> list[str]:
+    if days[0] == "all":
+        return [str(i) for i in range(1,26)]
+    return list(days)
+
+def add_cache_arguments(parser:ArgumentParser):
+    parser.add_argument("--cache",action="store_true",help="Load parsed inputs from the input cache when the input and the day did not change.")
+    parser.add_argument("--cache-size",type=float,default=64,metavar="MB",help="Size limit of the input cache.")
+
+def make_cache(arguments) -> InputCache|None:
+    if not arguments.cache:
+        return None
+    return InputCache(max_bytes=int(arguments.cache_size * 1024 * 1024))
+
+def parse_arguments(argv:list[str]):
+    parser = ArgumentParser(description="Runs the solutions for the given day(s).")
+    parser.add_argument("days",nargs="+",help="The day(s) to run, or the string \"all\" to run all days.")
+    parser.add_argument("-j","--jobs",type=int,default=1,help="Number of worker processes to spread the days over.")
+    add_cache_arguments(parser)
+    parser.add_argument("-m","--memory",action="store_true",help="Track peak and net allocations per phase (slows the run down).")
+    parser.add_argument("-p","--profile",type=Path,nargs="?",const=Path("profiles"),default=None,metavar="DIR",help="Profile every phase, writing .pstats and collapsed-stack files to DIR (default: profiles).")
+    parser.add_argument("--import-times",action="store_true",help="Report how long each day module took to import.")
+    parser.add_argument("--import-budget",type=float,default=None,metavar="MS",help="Exit with an error if importing the day modules took longer than this.")
+    return parser.parse_args(argv)
+
+def parse_bench_arguments(argv:list[str]):
+    parser = ArgumentParser(prog="main.py bench",description="Benchmarks the given day(s) over repeated runs.")
+    parser.add_argument("days",nargs="+",help="The day(s) to benchmark, or the string \"all\" to benchmark all days.")
+    parser.add_argument("-w","--warmup",type=int,default=3,help="Number of unmeasured runs before measuring.")
+    parser.add_argument("-r","--repeats",type=int,default=20,help="Number of measured runs.")
+    parser.add_argument("-f","--format",choices=("json","csv"),default=None,help="Also write the statistics in this format. Without -o they go to stdout, and the report moves to stderr.")
+    parser.add_argument("-o","--output",type=Path,default=None,help="File to write the statistics to, instead of stdout.")
+    add_cache_arguments(parser)
+    parser.add_argument("--save-baseline",type=Path,default=None,metavar="PATH",help="Store the statistics as a baseline for later runs.")
+    parser.add_argument("--baseline",type=Path,default=None,metavar="PATH",help="Compare against a stored baseline, and exit with an error on slowdowns.")
+    parser.add_argument("--threshold",type=float,default=10.0,metavar="PERCENT",help="How much slower (median) a phase may get before it counts as a regression.")
+    parser.add_argument("--min-delta",type=float,default=0.05,metavar="MS",help="Ignore slowdowns smaller than this, since tiny phases are mostly noise.")
+    arguments = parser.parse_args(argv)
+    if arguments.repeats < 1:
+        parser.error("--repeats must be at least 1.")
+    if arguments.baseline is not None and arguments.repeats < 5:
+        parser.error("Comparing against a baseline needs at least 5 repeats.")
+    return arguments
+
+def parse_scale_arguments(argv:list[str]):
+    parser = ArgumentParser(prog="main.py scale",description="Runs the given day(s) on generated inputs of growing size.")
+    parser.add_argument("days",nargs="+",help="The day(s) to run, or the string \"all\" to run every day that has an input generator.")
+    parser.add_argument("-s","--scales",type=lambda x:tuple(int(i) for i in x.split(",")),default=(1,10,100,1000),help="Comma-separated scale factors of the generated inputs.")
+    parser.add_argument("--seed",type=int,default=0,help="Seed for the input generators.")
+    parser.add_argument("-t","--timeout",type=float,default=60,metavar="SECONDS",help="Give up on a day (and all larger scales) when one run takes longer than this.")
+    parser.add_argument("--tolerance",type=float,default=0.25,help="How far above 1 the growth exponent may go before it is flagged as super-linear.")
+    return parser.parse_args(argv)
+
+def parse_batch_arguments(argv:list[str]):
+    parser = ArgumentParser(prog="main.py batch",description="Runs one day's solutions on every input file in a directory.")
+    parser.add_argument("day",help="The day to run.")
+    parser.add_argument("directory",type=Path,help="Directory containing the inputs.")
+    parser.add_argument("-g","--glob",default="*.txt",help="Pattern of the input files in the directory.")
+    parser.add_argument("-j","--jobs",type=int,default=1,help="Number of worker processes to spread the inputs over.")
+    add_cache_arguments(parser)
+    parser.add_argument("-q","--quiet",action="store_true",help="Only print failed inputs and the summary.")
+    return parser.parse_args(argv)
+
+def run_days(arguments):
+    days = expand_days(arguments.days)
+    modules = [day_module_name(day) for day in days]
+    options = RunOptions(make_cache(arguments),arguments.memory,arguments.profile)
+    
+    results = dict()
+    cpu_total = 0
+    start_time = perf_counter_ns()
+    if arguments.jobs > 1:
+        with ProcessPoolExecutor(max_workers=arguments.jobs) as pool:
+            futures = [pool.submit(solve_in_worker,name,options) for name in modules]
+            # Collect in day order; each day is printed as soon as it and all days before it are done.
+            for day,name,future in zip(days,modules,futures):
+                output,result,cpu_time,import_time = future.result()
+                IMPORT_TIMES[name] = import_time
+                print(output,end="")
+                results[day] = result
+                cpu_total += cpu_time
+    else:
+        for day,name in zip(days,modules):
+            cpu_start = process_time_ns()
+            result = solve(name,options)
+            cpu_total += (process_time_ns() - cpu_start) / 1_000_000
+            results[day] = result
+    end_time = perf_counter_ns()
+    
+    print(f"Total runtime: {(end_time - start_time)/1_000_000}; summed CPU time: {cpu_total}")
+    if arguments.import_times or arguments.import_budget is not None:
+        if not report_import_times(arguments.import_budget):
+            print("Importing the day modules went over budget.")
+            sys.exit(1)
+
+def run_bench(arguments):
+    import bench
+    modules = [day_module_name(day) for day in expand_days(arguments.days)]
+    cache = make_cache(arguments)
+    results = dict()
+    # With the statistics going to stdout, the report goes to stderr, so that
+    # stdout can be parsed as it is.
+    report = sys.stderr if arguments.format is not None and arguments.output is None else sys.stdout
+    for name in modules:
+        day = name[-2:]
+        results[day] = bench.benchmark_day(load_module(name),arguments.warmup,arguments.repeats,cache)
+        print(f"=== Day {day} ===",file=report)
+        for phase,stats in results[day].items():
+            print(f"  · {phase}: {stats!r}",file=report)
+    if cache is not None:
+        print(repr(cache),file=report)
+    # Compare before saving, so the same file can be given to both --baseline
+    # and --save-baseline to compare against the last run and then update it.
+    regressions = None
+    if arguments.baseline is not None:
+        baseline = bench.load_baseline(arguments.baseline)
+        regressions = bench.find_regressions(baseline,results,arguments.threshold / 100,arguments.min_delta)
+    if arguments.save_baseline is not None:
+        with open(arguments.save_baseline,"w") as baseline_file:
+            bench.write_json(results,baseline_file,arguments.warmup,arguments.repeats)
+    if arguments.format is not None:
+        write_bench_results(arguments,results)
+    if regressions is not None:
+        if len(regressions) > 0:
+            print(f"{len(regressions)} phase(s) got slower than the baseline:",file=report)
+            for regression in regressions:
+                print(f"  · {regression!r}",file=report)
             sys.exit(1)
+        print("No regressions against the baseline.",file=report)
+
+def run_scale(arguments):
+    import bench
+    import generators
+    if arguments.days[0] == "all":
+        days = list(generators.GENERATORS)
+    else:
+        days = [day_module_name(day)[-2:] for day in arguments.days]
+    for day in days:
+        if day not in generators.GENERATORS:
+            print(f"Day '{day}' has no input generator.")
+            sys.exit(1)
+    with TemporaryDirectory() as directory:
+        for day in days:
+            print(f"=== Day {day} ===")
+            points:list[bench.ScalePoint] = list()
+            for scale in arguments.scales:
+                text = generators.generate(day,scale,arguments.seed)
+                file_path = Path(directory) / f"day{day}_x{scale}.txt"
+                file_path.write_text(text)
+                measured = bench.measure_scaled(day_module_name(day),file_path,arguments.timeout)
+                file_path.unlink()
+                if measured is None:
+                    print(f"  · Scale {scale}: no result within {arguments.timeout} seconds, skipping larger scales.")
+                    break
+                points.append(bench.ScalePoint(scale,len(text),*measured))
+            report_scaling(points,arguments.tolerance)
+
+def run_batch(arguments):
+    import bench
+    module_name = day_module_name(arguments.day)
+    file_paths = sorted(path for path in arguments.directory.glob(arguments.glob) if path.is_file())
+    if len(file_paths) == 0:
+        print(f"No inputs matching '{arguments.glob}' in {arguments.directory}.")
+        sys.exit(1)
+    run_input = partial(bench.run_batch_input,module_name,cache=make_cache(arguments))
+    latencies = list()
+    failures = 0
+    start_time = perf_counter_ns()
+    if arguments.jobs > 1:
+        pool = ProcessPoolExecutor(max_workers=arguments.jobs)
+        results = pool.map(run_input,file_paths,chunksize=max(1,len(file_paths) // (4 * arguments.jobs)))
+    else:
+        load_module(module_name)
+        pool = None
+        results = map(run_input,file_paths)
+    try:
+        for result in results:
+            if result.error is not None:
+                failures += 1
+            else:
+                latencies.append(sum(result.times))
+            if result.error is not None or not arguments.quiet:
+                print(f"  · {result!r}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    seconds = (perf_counter_ns() - start_time) / 1_000_000_000
+    print(f"=== Day {module_name[-2:]}: {len(file_paths)} inputs in {seconds:.3f} s; {len(file_paths) / seconds:.1f} inputs/s ===")
+    if len(latencies) > 0:
+        print(f"  · Latency (ms): {bench.PhaseStats.from_samples(latencies)!r}")
+    if failures > 0:
+        print(f"  · {failures} input(s) failed.")
+        sys.exit(1)
+
+def report_scaling(points:"list[bench.ScalePoint]",tolerance:float):
+    import bench
+    if len(points) == 0:
+        return
+    totals = [point.total_time() for point in points]
+    peaks = [point.peak_bytes for point in points]
+    print("     scale     input (B)    total (ms)     peak (KiB)   time / memory")
+    for point,total,peak in zip(points,totals,peaks):
+        time_bar = bench.log_bar(total,min(totals),max(totals),20)
+        memory_bar = bench.log_bar(peak,min(peaks),max(peaks),20)
+        print(f"  {point.scale:>7}x {point.input_bytes:>13} {total:>13.3f} {peak / 1024:>14.1f}   {time_bar:<20} {memory_bar}")
+    sizes = [point.input_bytes for point in points]
+    for name,values in (("Time",totals),("Memory",peaks)):
+        exponent = bench.growth_exponent(sizes,values)
+        if exponent is None:
+            continue
+        flag = " <- super-linear!" if exponent > 1 + tolerance else ""
+        print(f"  · {name} grows as n^{exponent:.2f}{flag}")
+
+def write_bench_results(arguments,results:dict):
+    import bench
+    output = sys.stdout if arguments.output is None else open(arguments.output,"w",newline="")
+    try:
+        if arguments.format == "json":
+            bench.write_json(results,output,arguments.warmup,arguments.repeats)
+        else:
+            bench.write_csv(results,output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Please provide the day(s) to run as a command-line argument, or the string \"all\" to run all days.")
         sys.exit(1)
-    days = list()
-    if sys.argv[1] == "all":
-        days.extend(str(i) for i in range(1,26))
+    if sys.argv[1] == "bench":
+        run_bench(parse_bench_arguments(sys.argv[2:]))
+    elif sys.argv[1] == "scale":
+        run_scale(parse_scale_arguments(sys.argv[2:]))
+    elif sys.argv[1] == "batch":
+        run_batch(parse_batch_arguments(sys.argv[2:]))
     else:
-        days.extend(i for i in sys.argv[1:])
-    
-    results = dict()
-    start_time = perf_counter_ns()
-    for day in days:
-        daymodule = day_module(day)
-        result = daymodule.solve_day()
-        results[day] = result
-    end_time = perf_counter_ns()
-    
-    print(f"Total runtime: {(end_time - start_time)/1_000_000}")
\ No newline at end of file
+        run_days(parse_arguments(sys.argv[1:]))
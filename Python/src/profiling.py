@@ -0,0 +1,82 @@
+from cProfile import Profile
+from pathlib import Path
+from pstats import Stats
+from typing import NamedTuple
+
+class PhaseProfile(NamedTuple):
+    stats_path:Path
+    collapsed_path:Path
+    hot_functions:tuple[str,...]
+
+def function_label(function:tuple[str,int,str]) -> str:
+    filename,line,name = function
+    if filename == "~":
+        return name # Built-in functions have no source.
+    return f"{name} ({Path(filename).name}:{line})"
+
+def collapsed_stacks(stats:Stats,min_time:float = 1e-6) -> list[str]:
+    """ Turns profile statistics into flamegraph-style collapsed stacks, with the
+    self time of each stack in microseconds. cProfile only records caller/callee
+    pairs rather than whole stacks, so the time of a function is split over the
+    paths leading to it in proportion to how much time each caller spent in it. """
+    children:dict[tuple,dict[tuple,float]] = dict()
+    roots = list()
+    for function,(_,_,_,_,callers) in stats.stats.items():
+        if len(callers) == 0:
+            roots.append(function)
+        for caller,edge in callers.items():
+            children.setdefault(caller,dict())[function] = edge[3]
+    lines = list()
+
+    def walk(function:tuple,stack:list[str],path_time:float):
+        _,_,self_time,total_time,_ = stats.stats[function]
+        share = path_time / total_time if total_time > 0 else 0
+        stack.append(function_label(function))
+        microseconds = round(self_time * share * 1_000_000)
+        if microseconds > 0:
+            lines.append(f"{';'.join(stack)} {microseconds}")
+        for child,child_time in children.get(function,{}).items():
+            if function_label(child) in stack or child_time * share < min_time:
+                continue # Recursion is folded into the outermost call.
+            walk(child,stack,child_time * share)
+        stack.pop()
+
+    for root in roots:
+        walk(root,[],stats.stats[root][3])
+    return lines
+
+def hot_functions(stats:Stats,count:int = 5) -> tuple[str,...]:
+    """ The functions with the most self time, hottest first. """
+    ranked = sorted(stats.stats.items(),key=lambda item:item[1][2],reverse=True)
+    return tuple(
+        f"{function_label(function)}: {self_time * 1000:.3f} ms self, {total_time * 1000:.3f} ms total, {calls} calls"
+        for function,(_,calls,self_time,total_time,_) in ranked[:count]
+    )
+
+class PhaseProfiler:
+    """ Profiles each phase of a day separately, writing a .pstats file and a
+    collapsed-stack file per phase to the given directory. """
+
+    def __init__(self,directory:Path,prefix:str) -> None:
+        self.directory = directory
+        self.prefix = prefix
+        self.phases:list[PhaseProfile] = list()
+        self._profile = None
+
+    def begin(self) -> Profile:
+        """ Starts profiling a phase. The caller disables the returned profile as
+        soon as the phase is done, so that end() itself is not profiled. """
+        self._profile = Profile()
+        self._profile.enable()
+        return self._profile
+
+    def end(self,phase:str):
+        self.directory.mkdir(parents=True,exist_ok=True)
+        stats_path = self.directory / f"{self.prefix}_{phase}.pstats"
+        collapsed_path = self.directory / f"{self.prefix}_{phase}.collapsed"
+        self._profile.dump_stats(stats_path)
+        stats = Stats(self._profile)
+        with open(collapsed_path,"w") as collapsed_file:
+            collapsed_file.writelines(f"{line}\n" for line in collapsed_stacks(stats))
+        self.phases.append(PhaseProfile(stats_path,collapsed_path,hot_functions(stats)))
+        self._profile = None